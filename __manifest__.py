@@ -1,6 +1,6 @@
 {
     'name': 'Product REST API',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'category': 'API',
     'summary': 'RESTful API for products with stock and pricing information',
     'description': """
@@ -16,6 +16,7 @@
     'depends': ['base', 'mail', 'product', 'stock', 'sale', 'sale_management'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/vehicle_views.xml',
         'views/res_partner_views.xml',
     ],
@@ -1,4 +1,6 @@
+from . import metrics_controller
 from . import product_controller
 from . import sale_controller
+from . import stock_controller
 from . import user_signup_controller
 from . import vehicle_controller
\ No newline at end of file
@@ -0,0 +1,195 @@
+from odoo.http import request
+import base64
+import cProfile
+import functools
+import io
+import json
+import logging
+import math
+import os
+import pstats
+import threading
+import time
+
+from ..tools.metrics import route_metrics
+
+_logger = logging.getLogger(__name__)
+
+
+def instrumented(func):
+    endpoint = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        params = request.env['ir.config_parameter'].sudo()
+        try:
+            slow_ms = int(params.get_param('product_rest_api.slow_request_ms', 0) or 0)
+        except (TypeError, ValueError):
+            slow_ms = 0
+        # Sizing a JSON body means serializing it a second time, so it is opt-in.
+        measure_json = params.get_param('product_rest_api.measure_json_payload_size')
+        profile = slow_ms and params.get_param('product_rest_api.profile_slow_requests')
+
+        thread = threading.current_thread()
+        query_count = getattr(thread, 'query_count', 0)
+        query_time = getattr(thread, 'query_time', 0.0)
+        profiler = cProfile.Profile() if profile else None
+        result = None
+        status = 500
+        start = time.perf_counter()
+        try:
+            if profiler:
+                result = profiler.runcall(func, self, *args, **kwargs)
+            else:
+                result = func(self, *args, **kwargs)
+            status = _response_status(result)
+            return result
+        finally:
+            wall_time = time.perf_counter() - start
+            queries = getattr(thread, 'query_count', 0) - query_count
+            sql_time = getattr(thread, 'query_time', 0.0) - query_time
+            route_metrics.record(endpoint, status, wall_time, queries, sql_time, _payload_size(result, measure_json))
+
+            if slow_ms and wall_time * 1000 >= slow_ms:
+                _logger.warning("Slow API request %s: %.0f ms, %d queries, %.0f ms in SQL",
+                                endpoint, wall_time * 1000, queries, sql_time * 1000)
+                if profiler:
+                    _dump_profile(profiler, endpoint, params.get_param('product_rest_api.profile_dir'))
+    return wrapper
+
+
+def _response_status(result):
+    if isinstance(result, tuple):
+        return result[1]
+    return getattr(result, 'status_code', 200)
+
+
+def _payload_size(result, measure_json):
+    if result is None:
+        return 0
+    if hasattr(result, 'status_code'):
+        return result.content_length or 0
+    if not measure_json:
+        return 0
+    body = result[0] if isinstance(result, tuple) else result
+    return len(json.dumps(body, default=str))
+
+
+def _dump_profile(profiler, endpoint, profile_dir):
+    if profile_dir:
+        path = os.path.join(profile_dir, f"{endpoint}-{int(time.time() * 1000)}.prof")
+        profiler.dump_stats(path)
+        _logger.warning("Profile of %s written to %s", endpoint, path)
+        return
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(25)
+    _logger.warning("Profile of %s:\n%s", endpoint, output.getvalue())
+
+
+def api_key_required(allow_query_param=False, on_failure=None):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            token = request.httprequest.headers.get('X-API-Key')
+            if not token and allow_query_param:
+                token = request.httprequest.args.get('api_key')
+
+            if not request.env['api.access.key'].sudo()._check_api_key(token):
+                if on_failure:
+                    return on_failure()
+                return {'error': 'Unauthorized'}, 401
+
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cached_response(cache):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            headers = request.httprequest.headers
+            origin = (headers.get('X-Forwarded-Proto'), headers.get('X-Forwarded-Host'), request.httprequest.host_url)
+            key = (request.db, func.__name__, origin, json.dumps([args, kwargs], sort_keys=True, default=str))
+            result = cache.get(key)
+            if result is None:
+                result = func(self, *args, **kwargs)
+                if not isinstance(result, tuple):
+                    cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def encode_cursor(last_id):
+    payload = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))['id']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_id, int) or last_id < 0:
+        raise ValueError('Invalid cursor')
+    return last_id
+
+
+def encode_sync_cursor(last_id, watermark):
+    payload = json.dumps({'id': last_id, 'watermark': watermark}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_sync_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id, watermark = payload['id'], payload['watermark']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_id, int) or last_id < 0 or not isinstance(watermark, str):
+        raise ValueError('Invalid cursor')
+    return last_id, watermark
+
+
+def parse_quantity(value):
+    try:
+        quantity = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid quantity: {value}')
+    if not math.isfinite(quantity):
+        raise ValueError(f'Invalid quantity: {value}')
+    return quantity
+
+
+def parse_list_param(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def create_with_fallback(model, vals_list):
+    # One vals-list create for the whole batch; if any row fails, retry row by
+    # row so the valid ones are kept. Returns a record or an exception per row.
+    if not vals_list:
+        return []
+    try:
+        with model.env.cr.savepoint():
+            return list(model.create(vals_list))
+    except Exception:
+        pass
+
+    results = []
+    for vals in vals_list:
+        try:
+            with model.env.cr.savepoint():
+                results.append(model.create(vals))
+        except Exception as e:
+            results.append(e)
+    return results
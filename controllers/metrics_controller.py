@@ -0,0 +1,14 @@
+from odoo import http
+from odoo.http import request
+
+from ..tools.metrics import route_metrics
+from .common import api_key_required
+
+class MetricsAPIController(http.Controller):
+    @http.route('/api/metrics', type='http', auth='none', methods=['GET'], csrf=False)
+    @api_key_required(allow_query_param=True,
+                      on_failure=lambda: request.make_response('Unauthorized', status=401))
+    def get_metrics(self, **kwargs):
+        return request.make_response(route_metrics.render_prometheus(), headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+        ])
@@ -1,41 +1,161 @@
-from odoo import http
-from odoo.http import request
-import base64
+from odoo import http, fields, api, SUPERUSER_ID
+from odoo.http import request, Response
+from odoo.modules.registry import Registry
+from odoo.tools import escape_psql
+from datetime import timedelta
+import json
+import zlib
+
+from ..models.product_api_serializer import PRODUCT_API_FIELDS, PRODUCT_API_INCLUDES
+from ..models.product_api_tombstone import TOMBSTONE_RETENTION
+from ..tools.response_cache import product_response_cache
+from .common import (api_key_required, instrumented, cached_response, encode_cursor, decode_cursor,
+                     encode_sync_cursor, decode_sync_cursor, parse_list_param, parse_quantity)
+
+SYNC_WATERMARK_OVERLAP = timedelta(minutes=1)
+PRODUCT_IMAGE_SIZES = (128, 256, 512, 1024, 1920)
+EXPORT_CHUNK_SIZE = 1000
+SEARCH_MAX_LIMIT = 100
+PRODUCT_PAGE_MAX_LIMIT = 500
+SYNC_PAGE_MAX_LIMIT = 1000
 
 class ProductAPIController(http.Controller):
     @http.route('/api/products', type='json', auth='none', methods=['GET', 'POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    @cached_response(product_response_cache)
     def get_products(self, *args, **kwargs):
         try:
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
+            try:
+                limit = int(kwargs.get('limit', 50))
+            except (TypeError, ValueError):
+                return {'error': 'limit must be an integer'}, 400
+            if not 1 <= limit <= PRODUCT_PAGE_MAX_LIMIT:
+                return {'error': f'limit must be between 1 and {PRODUCT_PAGE_MAX_LIMIT}'}, 400
+            base_url = self._get_base_url(request)
+
+            try:
+                options = self._get_serializer_options(kwargs)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+
+            if 'cursor' in kwargs:
+                try:
+                    last_id = decode_cursor(kwargs.get('cursor'))
+                except ValueError as e:
+                    return {'error': str(e)}, 400
 
-            token = request.httprequest.headers.get('X-API-Key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
+                products = request.env['product.product'].sudo().search([('id', '>', last_id)], order='id', limit=limit)
+                result = request.env['product.api.serializer'].sudo().serialize_products(products, base_url, **options)
 
-            offset = int(kwargs.get('offset', 0))
-            limit = int(kwargs.get('limit', 50))
+                return {
+                    'products': result,
+                    'next_cursor': encode_cursor(products[-1].id) if len(products) == limit else None,
+                    'limit': limit,
+                    'count': len(result)
+                }
 
+            try:
+                offset = int(kwargs.get('offset', 0))
+            except (TypeError, ValueError):
+                return {'error': 'offset must be an integer'}, 400
+            if offset < 0:
+                return {'error': 'offset must not be negative'}, 400
             products = request.env['product.product'].sudo().search([], offset=offset, limit=limit)
+            result = request.env['product.api.serializer'].sudo().serialize_products(products, base_url, **options)
+
+            return {
+                'products': result,
+                'offset': offset,
+                'limit': limit,
+                'count': len(result)
+            }
+
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    @http.route('/api/products/changes', type='json', auth='none', methods=['GET', 'POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def get_product_changes(self, *args, **kwargs):
+        try:
+            changed_since = kwargs.get('changed_since')
+            if not changed_since:
+                return {'error': 'Missing changed_since'}, 400
+            if not isinstance(changed_since, str):
+                return {'error': 'Invalid changed_since, expected YYYY-MM-DD HH:MM:SS'}, 400
+            try:
+                since = fields.Datetime.to_datetime(changed_since.replace('T', ' ').rstrip('Z')[:19])
+            except ValueError:
+                return {'error': 'Invalid changed_since, expected YYYY-MM-DD HH:MM:SS'}, 400
+            if since < fields.Datetime.now() - TOMBSTONE_RETENTION:
+                return {'error': 'changed_since is older than the deletion history, run a full sync'}, 410
+
+            try:
+                limit = max(1, min(int(kwargs.get('limit', 200)), SYNC_PAGE_MAX_LIMIT))
+            except (TypeError, ValueError):
+                return {'error': 'limit must be an integer'}, 400
+
+            # The window is paged by id. The watermark is fixed on the first
+            # page and carried in the cursor, so rows changed while the client
+            # pages through are picked up by the next sync. Rows written by
+            # transactions still running when we read are only visible later,
+            # so the watermark is set slightly in the past.
+            cursor = kwargs.get('cursor')
+            if cursor:
+                try:
+                    last_id, watermark = decode_sync_cursor(cursor)
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+            else:
+                last_id = 0
+                watermark = fields.Datetime.to_string(fields.Datetime.now() - SYNC_WATERMARK_OVERLAP)
+
+            Product = request.env['product.product'].sudo().with_context(active_test=False)
+            changed = Product.search([
+                ('id', '>', last_id),
+                '|', '|', '|',
+                ('write_date', '>', since),
+                ('product_tmpl_id.write_date', '>', since),
+                ('product_template_attribute_value_ids.write_date', '>', since),
+                ('stock_quant_ids.write_date', '>', since),
+            ], order='id', limit=limit + 1)
+            has_more = len(changed) > limit
+            changed = changed[:limit]
+
+            archived = changed.filtered(lambda p: not p.active or not p.product_tmpl_id.active)
+            active = (changed - archived).with_context(active_test=True)
 
             base_url = self._get_base_url(request)
+            result = request.env['product.api.serializer'].sudo().serialize_products(active, base_url)
 
-            result = []
-            for product in products:
-                image_url = None
-                if product.image_1920:
-                    image_url = f"{base_url}/api/product/image/{product.id}"
+            deleted = [{
+                'id': product.id,
+                'reference_code': product.default_code,
+                'reason': 'archived',
+            } for product in archived]
 
-                result.append({
-                    'name': product.name,
-                    'reference_code': product.default_code,
-                    'image_url': image_url,
-                    'on_hand_qty': product.qty_available,
-                    'unit_price': product.lst_price,
-                })
+            if not cursor:
+                tombstones = request.env['product.api.tombstone'].sudo().search_read(
+                    [('deleted_at', '>', since)], ['product_id', 'reference_code'])
+                seen = set()
+                for tombstone in tombstones:
+                    if tombstone['product_id'] in seen:
+                        continue
+                    seen.add(tombstone['product_id'])
+                    deleted.append({
+                        'id': tombstone['product_id'],
+                        'reference_code': tombstone['reference_code'],
+                        'reason': 'deleted',
+                    })
 
+            # Clients advance changed_since to the watermark only once
+            # next_cursor is null.
             return {
                 'products': result,
-                'offset': offset,
+                'deleted': deleted,
+                'next_cursor': encode_sync_cursor(changed[-1].id, watermark) if has_more else None,
+                'watermark': watermark,
                 'limit': limit,
                 'count': len(result)
             }
@@ -43,6 +163,201 @@ class ProductAPIController(http.Controller):
         except Exception as e:
             return {'error': str(e)}, 500
 
+    @http.route('/api/products/search', type='json', auth='none', methods=['GET', 'POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def search_products(self, **kwargs):
+        try:
+            query = (kwargs.get('q') or '').strip()
+            match = kwargs.get('match', 'prefix')
+            field = kwargs.get('field', 'any')
+            try:
+                limit = max(1, min(int(kwargs.get('limit', 20)), SEARCH_MAX_LIMIT))
+            except (TypeError, ValueError):
+                return {'error': 'limit must be an integer'}, 400
+
+            if not query:
+                return {'error': 'Missing search query q'}, 400
+            if match not in ('prefix', 'substring'):
+                return {'error': 'match must be prefix or substring'}, 400
+            if field not in ('default_code', 'name', 'any'):
+                return {'error': 'field must be default_code, name or any'}, 400
+
+            try:
+                options = self._get_serializer_options(kwargs)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+
+            pattern = escape_psql(query) + '%'
+            if match == 'substring':
+                pattern = '%' + pattern
+
+            if field == 'any':
+                domain = ['|', ('default_code', '=ilike', pattern), ('name', '=ilike', pattern)]
+            else:
+                domain = [(field, '=ilike', pattern)]
+
+            products = request.env['product.product'].sudo().search(domain, order='default_code, id', limit=limit)
+            result = request.env['product.api.serializer'].sudo().serialize_products(
+                products, self._get_base_url(request), **options)
+
+            return {
+                'products': result,
+                'query': query,
+                'count': len(result)
+            }
+
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    @http.route('/api/prices', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def compute_prices(self, **kwargs):
+        try:
+            items = kwargs.get('items')
+            if not items or not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                return {'error': 'Invalid or missing items list'}, 400
+            if any(not item.get('product_code') and not item.get('product_id') for item in items):
+                return {'error': 'Each item needs a product_code or product_id'}, 400
+
+            partner = pricelist = None
+            if kwargs.get('partner_id'):
+                partner = request.env['res.partner'].sudo().browse(int(kwargs['partner_id'])).exists()
+                if not partner:
+                    return {'error': 'Customer not found'}, 404
+            if kwargs.get('pricelist_id'):
+                pricelist = request.env['product.pricelist'].sudo().browse(int(kwargs['pricelist_id'])).exists()
+                if not pricelist:
+                    return {'error': 'Pricelist not found'}, 404
+
+            products_by_code = request.env['sale.order.api.builder'].sudo().resolve_products(
+                [item['product_code'] for item in items if item.get('product_code')])
+            products_by_id = {product.id: product for product in request.env['product.product'].sudo().browse(
+                [int(item['product_id']) for item in items if item.get('product_id')]).exists()}
+
+            resolved = []
+            missing = []
+            for item in items:
+                if item.get('product_id'):
+                    product = products_by_id.get(int(item['product_id']))
+                else:
+                    product = products_by_code.get(item['product_code'])
+                if not product:
+                    missing.append(item.get('product_id') or item.get('product_code'))
+                    continue
+                try:
+                    resolved.append((product, parse_quantity(item.get('quantity', 1))))
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+            if missing:
+                return {'error': f"Products not found: {', '.join(map(str, missing))}"}, 400
+
+            pricing = request.env['product.api.pricing'].sudo()
+            pricelist = pricing.get_pricelist(partner=partner, pricelist=pricelist)
+            prices = pricing.compute_prices(resolved, pricelist)
+
+            return {
+                'pricelist_id': pricelist.id or None,
+                'currency': pricelist.currency_id.name if pricelist else None,
+                'prices': [{
+                    'product_id': product.id,
+                    'reference_code': product.default_code,
+                    'quantity': quantity,
+                    'unit_price': price,
+                } for (product, quantity), price in zip(resolved, prices)]
+            }
+
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    @http.route('/api/products/export', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required(allow_query_param=True,
+                      on_failure=lambda: request.make_json_response({'error': 'Unauthorized'}, status=401))
+    def export_products(self, **kwargs):
+        try:
+            options = self._get_serializer_options(kwargs)
+        except ValueError as e:
+            return request.make_json_response({'error': str(e)}, status=400)
+
+        compress = kwargs.get('gzip') in ('1', 'true')
+        headers = [('Content-Type', 'application/x-ndjson; charset=utf-8')]
+        if compress:
+            headers.append(('Content-Encoding', 'gzip'))
+
+        stream = self._stream_products(request.db, self._get_base_url(request), options, compress)
+        return Response(stream, headers=headers, direct_passthrough=True)
+
+    def _stream_products(self, dbname, base_url, options, compress):
+        # The request cursor is closed once the controller returns, so the
+        # export reads through its own cursor, one keyset chunk at a time,
+        # dropping the ORM cache between chunks to keep memory flat.
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+        with Registry(dbname).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            serializer = env['product.api.serializer']
+            if options['pricelist']:
+                options = dict(options, pricelist=options['pricelist'].with_env(env))
+            last_id = 0
+            while True:
+                products = env['product.product'].search([('id', '>', last_id)], order='id', limit=EXPORT_CHUNK_SIZE)
+                if not products:
+                    break
+                last_id = products[-1].id
+
+                rows = serializer.serialize_products(products, base_url, **options)
+                chunk = ''.join(json.dumps(row, default=str) + '\n' for row in rows).encode()
+                env.invalidate_all()
+
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+
+        if compressor:
+            yield compressor.flush()
+
+    @http.route('/api/cache/stats', type='json', auth='none', methods=['GET', 'POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def get_cache_stats(self, **kwargs):
+        return {'product_cache': product_response_cache.stats()}
+
+    def _get_image_attachment(self, product, size):
+        Attachment = request.env['ir.attachment'].sudo()
+        attachment = Attachment.search([
+            ('res_model', '=', 'product.product'),
+            ('res_field', '=', f'image_variant_{size}'),
+            ('res_id', '=', product.id),
+        ], limit=1)
+        if not attachment:
+            attachment = Attachment.search([
+                ('res_model', '=', 'product.template'),
+                ('res_field', '=', f'image_{size}'),
+                ('res_id', '=', product.product_tmpl_id.id),
+            ], limit=1)
+        return attachment
+
+    def _get_serializer_options(self, kwargs):
+        fields = parse_list_param(kwargs.get('fields'))
+        include = parse_list_param(kwargs.get('include'))
+
+        unknown = [name for name in fields if name not in PRODUCT_API_FIELDS]
+        unknown += [name for name in include if name not in PRODUCT_API_INCLUDES]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        pricelist = None
+        if kwargs.get('pricelist_id'):
+            pricelist = request.env['product.pricelist'].sudo().browse(int(kwargs['pricelist_id'])).exists()
+            if not pricelist:
+                raise ValueError(f"Pricelist with ID {kwargs['pricelist_id']} not found.")
+        elif 'pricelist_price' in include:
+            raise ValueError('pricelist_id is required to include pricelist_price')
+
+        return {'fields': fields, 'include': include, 'pricelist': pricelist}
+
     def _get_base_url(self, request):
         if request.httprequest.headers.get('X-Forwarded-Host'):
             protocol = 'https' if request.httprequest.headers.get('X-Forwarded-Proto') == 'https' else 'http'
@@ -52,23 +367,32 @@ class ProductAPIController(http.Controller):
         return f"{request.httprequest.scheme}://{request.httprequest.host}"
 
     @http.route('/api/product/image/<int:product_id>', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required(allow_query_param=True, on_failure=lambda: request.not_found())
     def get_product_image(self, product_id, **kwargs):
         try:
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-            token = request.httprequest.args.get('api_key') or request.httprequest.headers.get('X-API-Key')
+            try:
+                size = int(kwargs.get('size', 1920))
+            except (TypeError, ValueError):
+                size = None
+            if size not in PRODUCT_IMAGE_SIZES:
+                return request.make_response(f"Invalid size, expected one of {', '.join(map(str, PRODUCT_IMAGE_SIZES))}", status=400)
 
-            if token != configured_key:
+            product = request.env['product.product'].sudo().browse(product_id)
+            if not product.exists():
                 return request.not_found()
 
-            product = request.env['product.product'].sudo().browse(product_id)
-            if not product.exists() or not product.image_1920:
+            attachment = self._get_image_attachment(product, size)
+            if not attachment:
                 return request.not_found()
 
-            image_data = base64.b64decode(product.image_1920)
+            etag = attachment.checksum
+            if request.httprequest.if_none_match.contains(etag):
+                response = request.make_response(b'', status=304)
+            else:
+                response = request.env['ir.binary']._get_stream_from(attachment).get_response()
 
-            response = request.make_response(image_data)
-            response.headers['Content-Type'] = 'image/jpeg'
-            response.headers['Content-Length'] = str(len(image_data))
+            response.set_etag(etag)
             response.headers['Cache-Control'] = 'public, max-age=3600'
             response.headers['Access-Control-Allow-Origin'] = '*'
 
@@ -78,29 +402,22 @@ class ProductAPIController(http.Controller):
             return request.not_found()
 
     @http.route('/api/product/<int:product_id>', type='json', auth='none', methods=['GET'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    @cached_response(product_response_cache)
     def get_product_by_id(self, product_id, **kwargs):
         try:
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-
-            token = request.httprequest.headers.get('X-API-Key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
-
             product = request.env['product.product'].sudo().browse(product_id)
             if not product.exists():
                 return {'error': f"Product with ID {product_id} not found."}, 404
 
-            base_url = self._get_base_url(request)
-            image_url = f"{base_url}/api/product/image/{product.id}"
+            try:
+                options = self._get_serializer_options(kwargs)
+            except ValueError as e:
+                return {'error': str(e)}, 400
 
-            return {
-                'id': product.id,
-                'name': product.name,
-                'reference_code': product.default_code,
-                'image_url': image_url,
-                'on_hand_qty': product.qty_available,
-                'unit_price': product.lst_price,
-            }
+            base_url = self._get_base_url(request)
+            return request.env['product.api.serializer'].sudo().serialize_products(product, base_url, **options)[0]
 
         except Exception as e:
             return {'error': str(e)}, 500
\ No newline at end of file
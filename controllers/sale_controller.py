@@ -1,15 +1,61 @@
-from odoo import http, fields
+from odoo import http
 from odoo.http import request
 
+from .common import api_key_required, instrumented, parse_quantity
+
+ORDER_BATCH_MAX_SIZE = 500
+
+
+class _OrderRollback(Exception):
+    pass
+
+
 class SaleOrderAPIController(http.Controller):
     @http.route('/api/create_order', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
     def create_order(self, **kwargs):
+        idempotency_key = request.httprequest.headers.get('Idempotency-Key')
+        if not idempotency_key:
+            return self._create_order(**kwargs)
+
         try:
-            token = request.httprequest.headers.get('X-API-Key')
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
+            Idempotency = request.env['api.idempotency.key'].sudo()
+            request_hash = Idempotency._hash_request(kwargs)
+
+            record = Idempotency.search([('key', '=', idempotency_key), ('route', '=', '/api/create_order')], limit=1)
+            if not record:
+                record = Idempotency.reserve(idempotency_key, '/api/create_order', request_hash)
+            if not record:
+                return {'error': 'A request with this Idempotency-Key is already in progress'}, 409
+            if record.request_hash != request_hash:
+                return {'error': 'Idempotency-Key was already used with a different request'}, 422
+            if record.state == 'done':
+                return record.get_response()
+        except Exception as e:
+            return {'error': str(e)}, 500
 
+        # A failed attempt is rolled back before its key is released, so a
+        # retry with the same key cannot leave a second order behind.
+        try:
+            with request.env.cr.savepoint():
+                result = self._create_order(**kwargs)
+                response, status_code = result if isinstance(result, tuple) else (result, 200)
+                if status_code >= 500:
+                    raise _OrderRollback()
+        except _OrderRollback:
+            pass
+        if status_code >= 500:
+            try:
+                record.unlink()
+            except Exception:
+                pass
+        else:
+            record.store_response(response, status_code)
+        return result
+
+    def _create_order(self, **kwargs):
+        try:
             products = kwargs.get('products', [])
             payment_status = kwargs.get('payment_status', '').lower()
             delivery_address = kwargs.get('delivery_address')
@@ -17,6 +63,22 @@ class SaleOrderAPIController(http.Controller):
             if not products or not isinstance(products, list):
                 return {'error': 'Invalid or missing products list'}, 400
 
+            if any(not isinstance(line, dict) or not line.get('product_code') for line in products):
+                return {'error': 'Missing product_code in line item'}, 400
+
+            try:
+                for line in products:
+                    parse_quantity(line.get('quantity', 1))
+            except ValueError as e:
+                return {'error': str(e)}, 400
+
+            builder = request.env['sale.order.api.builder'].sudo()
+            products_by_code = builder.resolve_products([line['product_code'] for line in products])
+            missing_codes = list(dict.fromkeys(
+                line['product_code'] for line in products if line['product_code'] not in products_by_code))
+            if missing_codes:
+                return {'error': f"Products with codes {', '.join(map(str, missing_codes))} not found"}, 400
+
             system_user = request.env.ref('base.user_admin')
 
             customer = request.env['res.partner'].sudo().search([('customer_rank', '>', 0)], limit=1)
@@ -33,101 +95,213 @@ class SaleOrderAPIController(http.Controller):
             else:
                 delivery_partner = customer
 
-            sale_order = request.env['sale.order'].with_user(system_user).sudo().create({
+            sale_order = builder.create_order(system_user, {
                 'partner_id': customer.id,
                 'partner_shipping_id': delivery_partner.id,
-            })
-
-            for line in products:
-                product_code = line.get('product_code')
-                quantity = line.get('quantity', 1)
-
-                if not product_code:
-                    return {'error': 'Missing product_code in line item'}, 400
-
-                product = request.env['product.product'].sudo().search([('default_code', '=', product_code)], limit=1)
-                if not product:
-                    return {'error': f'Product with code {product_code} not found'}, 400
-
-                request.env['sale.order.line'].with_user(system_user).sudo().create({
-                    'order_id': sale_order.id,
-                    'product_id': product.id,
-                    'product_uom_qty': quantity,
-                    'price_unit': product.lst_price,
-                    'name': product.name,
-                })
+            }, products, products_by_code)
 
             invoice = None
+            fulfillment = None
 
             if payment_status == 'paid':
-                if sale_order.state == 'draft':
-                    sale_order.with_user(system_user).action_confirm()
-
-                pickings = sale_order.picking_ids.filtered(lambda p: p.state not in ['done', 'cancel'])
-                for picking in pickings:
-                    picking.action_confirm()
-                    picking.action_assign()
-
-                    for move in picking.move_ids_without_package:
-                        move.move_line_ids.unlink()
-                        request.env['stock.move.line'].sudo().create({
-                            'move_id': move.id,
-                            'picking_id': picking.id,
-                            'product_id': move.product_id.id,
-                            'product_uom_id': move.product_uom.id,
-                            'qty_done': move.product_uom_qty,
-                            'location_id': move.location_id.id,
-                            'location_dest_id': move.location_dest_id.id,
-                        })
-
-                    picking.button_validate()
-
-                invoice = sale_order._create_invoices()
-                invoice = invoice and invoice.exists() and invoice[0] or None
-
-                if invoice:
-                    invoice.action_post()
-
-                    journal = request.env['account.journal'].sudo().search([('type', '=', 'bank')], limit=1)
-                    if not journal:
-                        return {'error': 'No bank journal found'}, 500
-
-                    payment_wizard = request.env['account.payment.register'].sudo().with_context(
-                        active_model='account.move',
-                        active_ids=invoice.ids
-                    ).create({
-                        'payment_date': fields.Date.today(),
-                        'journal_id': journal.id,
-                        'amount': invoice.amount_total,
-                    })
-                    payment_wizard.action_create_payments()
+                if kwargs.get('async_fulfillment'):
+                    request.env['sale.order.fulfillment.job'].sudo().enqueue(sale_order, system_user)
+                    fulfillment = 'queued'
+                else:
+                    invoice = builder.fulfill_paid_order(sale_order, system_user)
+                    fulfillment = 'done'
 
             return {
                 "message": "Sale Order created successfully",
                 "sale_order": sale_order.name,
                 "invoice": invoice.name if invoice else None,
-                "status": payment_status.capitalize() or 'Unpaid'
+                "status": payment_status.capitalize() or 'Unpaid',
+                "fulfillment": fulfillment
             }
 
         except Exception as e:
             return {'error': str(e)}, 500
 
+    @http.route('/api/create_orders', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def create_orders(self, **kwargs):
+        try:
+            orders = kwargs.get('orders')
+            if not orders or not isinstance(orders, list):
+                return {'error': 'Invalid or missing orders list'}, 400
+            if len(orders) > ORDER_BATCH_MAX_SIZE:
+                return {'error': f'At most {ORDER_BATCH_MAX_SIZE} orders per batch'}, 400
+
+            builder = request.env['sale.order.api.builder'].sudo()
+            system_user = request.env.ref('base.user_admin')
+
+            codes = [line.get('product_code') for order in orders if isinstance(order, dict)
+                     for line in (order.get('products') or []) if isinstance(line, dict)]
+            products_by_code = builder.resolve_products([code for code in codes if code])
+
+            customer_ids = {int(order['customer_id']) for order in orders
+                            if isinstance(order, dict) and str(order.get('customer_id') or '').isdigit()}
+            customers = {customer.id: customer for customer in request.env['res.partner'].sudo().browse(customer_ids).exists()}
+            default_customer = request.env['res.partner'].sudo().search([('customer_rank', '>', 0)], limit=1)
+
+            results = [None] * len(orders)
+            valid = []
+            for index, order in enumerate(orders):
+                error = self._validate_batch_order(order, products_by_code, customers, default_customer)
+                if error:
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': error}
+                    continue
+                customer = customers[int(order['customer_id'])] if order.get('customer_id') else default_customer
+                valid.append((index, order, customer))
+
+            try:
+                with request.env.cr.savepoint():
+                    created = list(zip(valid, self._create_order_group(builder, system_user, valid, products_by_code)))
+            except Exception:
+                created = []
+                for entry in valid:
+                    try:
+                        with request.env.cr.savepoint():
+                            created.append((entry, self._create_order_group(builder, system_user, [entry], products_by_code)[0]))
+                    except Exception as e:
+                        results[entry[0]] = {'index': entry[0], 'status': 'Failure', 'reason': str(e)}
+
+            journal = request.env['account.journal'].sudo().search([('type', '=', 'bank')], limit=1)
+            for (index, order, customer), sale_order in created:
+                result = {'index': index, 'status': 'Success', 'sale_order': sale_order.name,
+                          'invoice': None, 'fulfillment': None}
+                if (order.get('payment_status') or '').lower() == 'paid':
+                    if kwargs.get('async_fulfillment') or order.get('async_fulfillment'):
+                        request.env['sale.order.fulfillment.job'].sudo().enqueue(sale_order, system_user)
+                        result['fulfillment'] = 'queued'
+                    else:
+                        try:
+                            with request.env.cr.savepoint():
+                                invoice = builder.fulfill_paid_order(sale_order, system_user, journal=journal)
+                            result.update(invoice=invoice.name if invoice else None, fulfillment='done')
+                        except Exception as e:
+                            result.update(fulfillment='failed', fulfillment_error=str(e))
+                results[index] = result
+
+            return {
+                'status': 'Success',
+                'created': sum(1 for result in results if result['status'] == 'Success'),
+                'failed': sum(1 for result in results if result['status'] == 'Failure'),
+                'results': results
+            }
+
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    def _validate_batch_order(self, order, products_by_code, customers, default_customer):
+        if not isinstance(order, dict):
+            return 'Invalid order'
+        products = order.get('products')
+        if not products or not isinstance(products, list):
+            return 'Invalid or missing products list'
+        if any(not isinstance(line, dict) or not line.get('product_code') for line in products):
+            return 'Missing product_code in line item'
+        try:
+            for line in products:
+                parse_quantity(line.get('quantity', 1))
+        except ValueError as e:
+            return str(e)
+        missing_codes = list(dict.fromkeys(
+            line['product_code'] for line in products if line['product_code'] not in products_by_code))
+        if missing_codes:
+            return f"Products with codes {', '.join(map(str, missing_codes))} not found"
+        if order.get('customer_id'):
+            if not str(order['customer_id']).isdigit() or int(order['customer_id']) not in customers:
+                return 'Customer not found'
+        elif not default_customer:
+            return 'No customer found in the system'
+        return None
+
+    def _create_order_group(self, builder, system_user, entries, products_by_code):
+        with_address = [(order, customer) for index, order, customer in entries if order.get('delivery_address')]
+        delivery_partners = iter(request.env['res.partner'].sudo().create([{
+            'name': customer.name + ' (Delivery)',
+            'street': order['delivery_address'],
+            'type': 'delivery',
+            'parent_id': customer.id,
+        } for order, customer in with_address]))
+
+        order_data = []
+        for index, order, customer in entries:
+            delivery_partner = next(delivery_partners) if order.get('delivery_address') else customer
+            order_data.append(({
+                'partner_id': customer.id,
+                'partner_shipping_id': delivery_partner.id,
+            }, order['products']))
+        return builder.create_orders(system_user, order_data, products_by_code)
+
     @http.route('/api/track_order', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
     def track_order(self, **kwargs):
         try:
-            token = request.httprequest.headers.get('X-API-Key')
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
-
             sale_order_id = kwargs.get('sale_order_id')
             if not sale_order_id:
                 return {'status': 'Failure', 'reason': 'Missing sale_order_id'}, 400
 
-            sale_order = request.env['sale.order'].sudo().browse(int(sale_order_id))
+            sale_order = request.env['sale.order'].sudo().browse(int(sale_order_id)).exists()
             if not sale_order:
                 return {'status': 'Failure', 'reason': 'Sale Order not found'}, 404
 
+            return dict({'status': 'Success'}, **self._get_order_statuses(sale_order)[0])
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    @http.route('/api/track_orders', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def track_orders(self, **kwargs):
+        try:
+            sale_order_ids = kwargs.get('sale_order_ids') or []
+            sale_order_names = kwargs.get('sale_order_names') or []
+            if not isinstance(sale_order_ids, list) or not isinstance(sale_order_names, list):
+                return {'status': 'Failure', 'reason': 'sale_order_ids and sale_order_names must be lists'}, 400
+            if not sale_order_ids and not sale_order_names:
+                return {'status': 'Failure', 'reason': 'Missing sale_order_ids or sale_order_names'}, 400
+
+            if len(sale_order_ids) + len(sale_order_names) > ORDER_BATCH_MAX_SIZE:
+                return {'status': 'Failure', 'reason': f'At most {ORDER_BATCH_MAX_SIZE} orders per request'}, 400
+
+            try:
+                sale_order_ids = [int(order_id) for order_id in sale_order_ids]
+            except (TypeError, ValueError):
+                return {'status': 'Failure', 'reason': 'sale_order_ids must be integers'}, 400
+            sale_orders = request.env['sale.order'].sudo().search(
+                ['|', ('id', 'in', sale_order_ids), ('name', 'in', sale_order_names)], order='id')
+
+            found_ids = set(sale_orders.ids)
+            found_names = set(sale_orders.mapped('name'))
+
+            return {
+                'status': 'Success',
+                'orders': self._get_order_statuses(sale_orders),
+                'not_found': [order_id for order_id in sale_order_ids if order_id not in found_ids]
+                             + [name for name in sale_order_names if name not in found_names],
+            }
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    def _get_order_statuses(self, sale_orders):
+        # Touching a field on one record fetches it for the whole recordset, so
+        # lines, invoices and pickings are loaded once for all orders.
+        sale_orders.mapped('partner_id.name')
+        sale_orders.order_line.mapped('product_id.name')
+        sale_orders.invoice_ids.mapped('payment_state')
+        sale_orders.picking_ids.mapped('state')
+
+        jobs = {}
+        for job in request.env['sale.order.fulfillment.job'].sudo().search(
+                [('sale_order_id', 'in', sale_orders.ids)], order='id desc'):
+            jobs.setdefault(job.sale_order_id.id, job)
+
+        statuses = []
+        for sale_order in sale_orders:
             order_lines = []
             for line in sale_order.order_line:
                 order_lines.append({
@@ -150,14 +324,17 @@ class SaleOrderAPIController(http.Controller):
             else:
                 delivery_status = 'No Delivery'
 
-            return {
-                'status': 'Success',
+            job = jobs.get(sale_order.id)
+
+            statuses.append({
                 'order_id': sale_order.id,
+                'order_name': sale_order.name,
                 'customer': sale_order.partner_id.name,
                 'order_lines': order_lines,
                 'total_amount': sale_order.amount_total,
                 'payment_status': payment_status,
-                'delivery_status': delivery_status
-            }
-        except Exception as e:
-            return {'error': str(e)}, 500
\ No newline at end of file
+                'delivery_status': delivery_status,
+                'fulfillment_status': job.state if job else None,
+                'fulfillment_error': job.error if job else None
+            })
+        return statuses
\ No newline at end of file
@@ -0,0 +1,46 @@
+from odoo import http
+from odoo.http import request
+
+from .common import api_key_required, instrumented
+
+STOCK_SNAPSHOT_MAX_PRODUCTS = 1000
+
+class StockAPIController(http.Controller):
+    @http.route('/api/stock/locations', type='json', auth='none', methods=['GET', 'POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def get_stock_by_location(self, **kwargs):
+        try:
+            product_ids = kwargs.get('product_ids') or []
+            reference_codes = kwargs.get('reference_codes') or []
+            category_id = kwargs.get('category_id')
+
+            if not isinstance(product_ids, list) or not isinstance(reference_codes, list):
+                return {'error': 'product_ids and reference_codes must be lists'}, 400
+
+            if product_ids:
+                domain = [('id', 'in', [int(product_id) for product_id in product_ids])]
+            elif reference_codes:
+                domain = [('default_code', 'in', reference_codes)]
+            elif category_id:
+                domain = [('categ_id', 'child_of', int(category_id))]
+            else:
+                return {'error': 'Provide product_ids, reference_codes or category_id'}, 400
+
+            products = request.env['product.product'].sudo().search(domain, order='id', limit=STOCK_SNAPSHOT_MAX_PRODUCTS + 1)
+            if len(products) > STOCK_SNAPSHOT_MAX_PRODUCTS:
+                return {'error': f'Too many products, at most {STOCK_SNAPSHOT_MAX_PRODUCTS} per request'}, 400
+
+            snapshot = request.env['product.stock.snapshot'].sudo().get_snapshot(products)
+
+            return {
+                'products': [{
+                    'id': product.id,
+                    'reference_code': product.default_code,
+                    'locations': snapshot[product.id],
+                } for product in products],
+                'count': len(products)
+            }
+
+        except Exception as e:
+            return {'error': str(e)}, 500
@@ -1,7 +1,13 @@
+import logging
+
 from odoo import http
 from odoo.http import request
-import secrets
-import string
+
+from .common import api_key_required, instrumented, create_with_fallback
+
+_logger = logging.getLogger(__name__)
+
+SIGNUP_BATCH_MAX_SIZE = 1000
 
 class UserSignupAPI(http.Controller):
     def _get_base_url(self, request):
@@ -13,7 +19,13 @@ class UserSignupAPI(http.Controller):
 
         return f"{request.httprequest.scheme}://{request.httprequest.host}"
 
+    def _use_mail_queue(self):
+        return request.env['ir.config_parameter'].sudo().get_param('product_rest_api.mail_delivery', 'queue') != 'sync'
+
     def _send_login_email(self, admin_env, user, password, user_name):
+        if self._use_mail_queue():
+            return self._queue_login_emails(admin_env, [(user, password)])
+
         try:
             base_url = self._get_base_url(request)
 
@@ -24,6 +36,7 @@ class UserSignupAPI(http.Controller):
                 'password': password,
                 'reset_link': api_reset_link,
             }
+
             template.with_context(ctx).sudo().send_mail(user.id, force_send=True)
 
             try:
@@ -32,12 +45,38 @@ class UserSignupAPI(http.Controller):
             except Exception as reset_err:
                 print(f"Password reset email failed: {reset_err}")
 
-            return True
+            return 'sent'
 
         except Exception as e:
-            return False
+            return 'failed'
+
+    def _queue_login_emails(self, admin_env, users_with_passwords):
+        try:
+            api_reset_link = f"{self._get_base_url(request)}/api/reset_password"
+            template = admin_env.ref('product_rest_api.customer_signup_account_created_template').sudo()
+            users = admin_env['res.users'].sudo().browse([user.id for user, password in users_with_passwords])
+
+            # Each account mail carries its own password, so it is rendered
+            # per user; the reset mails are rendered in one batch.
+            for user, password in users_with_passwords:
+                template.with_context(password=password, reset_link=api_reset_link).send_mail(
+                    user.id, force_send=False, email_values={'is_api_mail': True})
+
+            try:
+                users.partner_id.signup_prepare(signup_type='reset')
+                admin_env.ref('auth_signup.reset_password_email').sudo().send_mail_batch(
+                    users.ids, force_send=False, email_values={'is_api_mail': True})
+            except Exception as reset_err:
+                _logger.warning("Password reset email could not be queued: %s", reset_err)
+
+            admin_env['mail.mail']._trigger_api_mail_sender()
+            return 'queued'
+
+        except Exception as e:
+            return 'failed'
 
     @http.route('/api/otp/send', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
     def send_otp(self, **kwargs):
         email = kwargs.get('email')
 
@@ -48,8 +87,12 @@ class UserSignupAPI(http.Controller):
         if existing_user:
             return {'error': 'Email is already registered'}, 409
 
-        otp_record = request.env['customer.otp'].sudo().generate_otp(email)
-        if not otp_record:
+        ip_address = request.httprequest.remote_addr
+        if not request.env['customer.otp'].sudo().check_rate_limit(email, ip_address):
+            return {'error': 'Too many OTP requests, please try again later'}, 429
+
+        otp_code = request.env['customer.otp'].sudo().generate_otp(email, ip_address)
+        if not otp_code:
             return {'error': 'Failed to generate OTP'}, 500
 
         try:
@@ -57,17 +100,23 @@ class UserSignupAPI(http.Controller):
                 'email_from': 'noreply@yourcompany.com',
                 'email_to': email,
                 'subject': 'Your OTP Code',
-                'body_html': f'<p>Your OTP code is: <strong>{otp_record.otp}</strong>. It is valid for 5 minutes.</p>'
+                'body_html': f'<p>Your OTP code is: <strong>{otp_code}</strong>. It is valid for 5 minutes.</p>'
             }
-            mail = request.env['mail.mail'].sudo().create(email_values)
-            mail.sudo().send()
+            if self._use_mail_queue():
+                request.env['mail.mail'].sudo().queue_api_mail(email_values)
+                email_status = 'queued'
+            else:
+                mail = request.env['mail.mail'].sudo().create(email_values)
+                mail.sudo().send()
+                email_status = 'sent'
         except Exception as e:
             print(f"Error details: {str(e)}")
             return {'error': f'Failed to send OTP email: {str(e)}'}, 500
 
-        return {'success': True, 'message': f'OTP sent to {email}'}
+        return {'success': True, 'message': f'OTP {email_status} for {email}', 'email_status': email_status}
 
     @http.route('/api/signup', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
     def signup_user(self, **kwargs):
         new_user = None
         try:
@@ -81,26 +130,16 @@ class UserSignupAPI(http.Controller):
             if '@' not in email:
                 return {'error': 'Invalid email format'}, 400
 
-            otp_record = request.env['customer.otp'].sudo().search([('email', '=', email)], limit=1)
-            if not otp_record or otp_record.otp != otp:
+            otp_record = request.env['customer.otp'].sudo().validate_otp(email, otp)
+            if not otp_record:
                 return {'error': 'Invalid or expired OTP'}, 401
 
-            characters = string.ascii_letters + string.digits + "!@#$%&*"
-            generated_password = ''.join(secrets.choice(characters) for i in range(12))
-
-            try:
-                admin_user = request.env.ref('base.user_admin')
-                if not admin_user or not admin_user.exists():
-                    admin_user = request.env['res.users'].sudo().search([('id', '=', 2)], limit=1)
-                if not admin_user or not admin_user.exists():
-                    admin_user = request.env['res.users'].sudo().search([('id', '=', 1)], limit=1)
-                if not admin_user or not admin_user.exists():
-                    return {'error': 'No admin user found'}, 500
-
-            except Exception as admin_err:
-                return {'error': 'Admin user configuration error'}, 500
+            provisioning = request.env['res.users.api.provisioning'].sudo()
+            configuration_error = provisioning.check_configuration()
+            if configuration_error:
+                return {'error': configuration_error}, 500
 
-            admin_env = request.env(user=admin_user)
+            admin_env = request.env(user=provisioning.get_admin_user())
 
             existing_user = admin_env['res.users'].sudo().search([('login', '=', email)], limit=1)
             if existing_user:
@@ -109,55 +148,17 @@ class UserSignupAPI(http.Controller):
                     'existing_user_id': existing_user.id
                 }, 409
 
-            company = admin_env['res.company'].sudo().browse(1)
-            if not company:
-                return {'error': 'No company found'}, 500
+            generated_password = provisioning.generate_password()
 
             try:
-                portal_group = admin_env.ref('base.group_portal')
-                if not portal_group:
-                    return {'error': 'Portal group not found'}, 500
-            except Exception as group_err:
-                print(f"Portal group error: {group_err}")
-
-            try:
-                user_vals = {
-                    'name': name,
-                    'login': email,
-                    'email': email,
-                    'password': generated_password,
-                    'company_id': company.id,
-                    'company_ids': [(6, 0, [company.id])],
-                    'groups_id': [(6, 0, portal_group.ids)],
-                    'active': True,
-                    'share': True,
-                }
-
-                new_user = admin_env['res.users'].sudo().create(user_vals)
-
+                new_user = provisioning.create_users([provisioning.prepare_user_vals(name, email, generated_password)])
                 partner = new_user.partner_id
-                if not partner:
-                    raise Exception('Auto-created partner not found')
+                otp_record.sudo().unlink()
 
             except Exception as user_err:
                 return {'error': f'User creation failed: {str(user_err)}'}, 500
 
-            try:
-                partner_updates = {
-                    'is_company': False,
-                    'customer_rank': 1,
-                }
-                partner.sudo().write(partner_updates)
-                otp_record.sudo().unlink()
-
-            except Exception as partner_err:
-                return {'error': f'Partner update failed: {str(partner_err)}'}, 500
-
-            try:
-                self._send_login_email(admin_env, new_user, generated_password, name)
-                email_sent = True
-            except Exception as email_err:
-                email_sent = False
+            email_status = self._send_login_email(admin_env, new_user, generated_password, name)
 
             return {
                 'success': True,
@@ -166,7 +167,7 @@ class UserSignupAPI(http.Controller):
                 'user_id': new_user.id,
                 'login_email': email,
                 'generated_password': generated_password,
-                'email_sent': email_sent,
+                'email_status': email_status,
                 'user_share': new_user.share,
                 'user_groups': new_user.groups_id.mapped('name')
             }
@@ -174,7 +175,84 @@ class UserSignupAPI(http.Controller):
         except Exception as e:
             return {'error': f'Account creation failed: {str(e)}'}, 500
 
+    @http.route('/api/signup/bulk', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
+    def bulk_signup_users(self, **kwargs):
+        try:
+            customers = kwargs.get('customers')
+            send_email = kwargs.get('send_email', True)
+            if not customers or not isinstance(customers, list):
+                return {'error': 'Invalid or missing customers list'}, 400
+            if len(customers) > SIGNUP_BATCH_MAX_SIZE:
+                return {'error': f'At most {SIGNUP_BATCH_MAX_SIZE} customers per batch'}, 400
+
+            provisioning = request.env['res.users.api.provisioning'].sudo()
+            configuration_error = provisioning.check_configuration()
+            if configuration_error:
+                return {'error': configuration_error}, 500
+
+            admin_env = request.env(user=provisioning.get_admin_user())
+
+            emails = [customer.get('email') for customer in customers if isinstance(customer, dict) and customer.get('email')]
+            existing_logins = set(admin_env['res.users'].sudo().with_context(active_test=False).search(
+                [('login', 'in', emails)]).mapped('login'))
+
+            results = [None] * len(customers)
+            to_create = []
+            seen = set()
+            for index, customer in enumerate(customers):
+                if not isinstance(customer, dict) or not customer.get('name') or not customer.get('email'):
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'Missing required fields: name, email'}
+                elif '@' not in customer['email']:
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'Invalid email format'}
+                elif customer['email'] in existing_logins or customer['email'] in seen:
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'User with this email already exists'}
+                else:
+                    seen.add(customer['email'])
+                    password = provisioning.generate_password()
+                    to_create.append((index, customer, password))
+
+            created = create_with_fallback(provisioning.get_users_model(), [
+                provisioning.prepare_user_vals(customer['name'], customer['email'], password)
+                for index, customer, password in to_create
+            ])
+
+            new_users = []
+            for (index, customer, password), user in zip(to_create, created):
+                if isinstance(user, Exception):
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': str(user)}
+                    continue
+                results[index] = {
+                    'index': index,
+                    'status': 'Success',
+                    'customer_id': user.partner_id.id,
+                    'user_id': user.id,
+                    'login_email': customer['email'],
+                    'generated_password': password,
+                    'email_status': None,
+                }
+                new_users.append((index, user, password))
+
+            # Login mails are always queued here, in one batch with a single
+            # trigger of the sender cron.
+            if send_email and new_users:
+                email_status = self._queue_login_emails(admin_env, [(user, password) for index, user, password in new_users])
+                for index, user, password in new_users:
+                    results[index]['email_status'] = email_status
+
+            return {
+                'success': True,
+                'created': sum(1 for result in results if result['status'] == 'Success'),
+                'failed': sum(1 for result in results if result['status'] == 'Failure'),
+                'results': results
+            }
+
+        except Exception as e:
+            return {'error': f'Bulk account creation failed: {str(e)}'}, 500
+
     @http.route('/api/reset_password', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
     def reset_password(self, **kwargs):
         try:
             email = kwargs.get('email')
@@ -187,18 +265,9 @@ class UserSignupAPI(http.Controller):
             if len(new_password) < 8:
                 return {'error': 'New password must be at least 8 characters long'}, 400
 
-            try:
-                admin_user = request.env.ref('base.user_admin')
-                if not admin_user or not admin_user.exists():
-                    admin_user = request.env['res.users'].sudo().search([('id', '=', 2)], limit=1)
-                if not admin_user or not admin_user.exists():
-                    admin_user = request.env['res.users'].sudo().search([('id', '=', 1)], limit=1)
-
-                if not admin_user or not admin_user.exists():
-                    return {'error': 'No admin user found'}, 500
-
-            except Exception as admin_err:
-                return {'error': 'Admin user configuration error'}, 500
+            admin_user = request.env['res.users.api.provisioning'].sudo().get_admin_user()
+            if not admin_user:
+                return {'error': 'No admin user found'}, 500
 
             admin_env = request.env(user=admin_user)
 
@@ -231,13 +300,10 @@ class UserSignupAPI(http.Controller):
             return {'error': f'Password change failed: {str(e)}'}, 500
 
     @http.route('/api/shipping_address', type='json', auth='none', methods=['POST'], csrf=False, cors='*')
+    @instrumented
+    @api_key_required()
     def add_update_shipping_address(self, **kwargs):
         try:
-            token = request.httprequest.headers.get('X-API-Key')
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
-
             customer_id = kwargs.get('customer_id')
             shipping_address = kwargs.get('shipping_address')
 
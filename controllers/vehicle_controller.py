@@ -1,8 +1,66 @@
 from odoo import http
 from odoo.http import request
+import psycopg2
+
+from .common import api_key_required, instrumented, create_with_fallback, encode_cursor, decode_cursor
+
+VEHICLE_LIST_MAX_LIMIT = 500
 
 class VehicleController(http.Controller):
+    @http.route('/api/vehicles', type='json', auth='none', methods=['GET', 'POST'], csrf=False, cors="*")
+    @instrumented
+    @api_key_required()
+    def list_vehicles(self, **kwargs):
+        try:
+            try:
+                limit = int(kwargs.get('limit', 50))
+            except (TypeError, ValueError):
+                return {'error': 'limit must be an integer'}, 400
+            if not 1 <= limit <= VEHICLE_LIST_MAX_LIMIT:
+                return {'error': f'limit must be between 1 and {VEHICLE_LIST_MAX_LIMIT}'}, 400
+            try:
+                last_id = decode_cursor(kwargs.get('cursor'))
+            except ValueError as e:
+                return {'error': str(e)}, 400
+
+            domain = [('id', '>', last_id)]
+            if kwargs.get('owner_id'):
+                domain.append(('owner_id', '=', int(kwargs['owner_id'])))
+            if kwargs.get('registration_number'):
+                domain.append(('registration_number', '=', kwargs['registration_number']))
+            if kwargs.get('model'):
+                domain.append(('model', '=', kwargs['model']))
+
+            rows = request.env['vehicle.management'].sudo().search_read(
+                domain,
+                ['vehicle_name', 'registration_number', 'model', 'registration_year', 'colour', 'owner_id'],
+                order='id',
+                limit=limit,
+            )
+
+            vehicles = [{
+                'vehicle_id': row['id'],
+                'name': row['vehicle_name'],
+                'registration_number': row['registration_number'],
+                'model': row['model'],
+                'registration_year': row['registration_year'],
+                'colour': row['colour'],
+                'owner_id': row['owner_id'][0] if row['owner_id'] else None,
+                'owner': row['owner_id'][1] if row['owner_id'] else None,
+            } for row in rows]
+
+            return {
+                'status': 'Success',
+                'vehicles': vehicles,
+                'next_cursor': encode_cursor(rows[-1]['id']) if len(rows) == limit else None,
+                'count': len(vehicles)
+            }
+        except Exception as e:
+            return {'error': str(e)}, 500
+
     @http.route('/api/vehicle/create', type='json', auth='none', methods=['POST'], csrf=False, cors="*")
+    @instrumented
+    @api_key_required()
     def create_vehicle(self, **kwargs):
         try:
             name = kwargs.get('name')
@@ -15,29 +73,36 @@ class VehicleController(http.Controller):
             if not name or not registration_number or not owner_id:
                 return {'error': 'Required field missing'}, 400
 
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-            token = request.httprequest.headers.get('X-API-Key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
-
             partner = request.env['res.partner'].sudo().browse(owner_id)
             if not partner.exists():
                 return {'status': 'Failure', 'reason': 'Partner not found'}
 
-            vehicle = request.env['vehicle.management'].sudo().create({
-                'vehicle_name': name,
-                'registration_number': registration_number,
-                'model': model,
-                'registration_year': registration_year,
-                'colour': colour,
-                'owner_id': owner_id,
-            })
+            Vehicle = request.env['vehicle.management'].sudo()
+            duplicate_error = ({'status': 'Failure', 'reason': 'This owner already has a vehicle with this registration number'}, 409)
+            if Vehicle.search_count([('owner_id', '=', partner.id), ('registration_number', '=', registration_number)], limit=1):
+                return duplicate_error
+
+            try:
+                with request.env.cr.savepoint():
+                    vehicle = Vehicle.create({
+                        'vehicle_name': name,
+                        'registration_number': registration_number,
+                        'model': model,
+                        'registration_year': registration_year,
+                        'colour': colour,
+                        'owner_id': owner_id,
+                    })
+                    vehicle.flush_recordset()
+            except psycopg2.IntegrityError:
+                return duplicate_error
 
             return {'status': 'Success', 'vehicle_id': vehicle.id}
         except Exception as e:
             return {'error': str(e)}, 500
 
     @http.route('/api/vehicle/delete', type='json', auth='none', methods=['DELETE'], csrf=False, cors="*")
+    @instrumented
+    @api_key_required()
     def delete_vehicle(self, **kwargs):
         try:
             registration_number = kwargs.get('registration_number')
@@ -46,11 +111,6 @@ class VehicleController(http.Controller):
             if not registration_number or not owner_id:
                 return {'error': 'Required field missing'}, 400
 
-            configured_key = request.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
-            token = request.httprequest.headers.get('X-API-Key')
-            if token != configured_key:
-                return {'error': 'Unauthorized'}, 401
-
             vehicle = request.env['vehicle.management'].sudo().search([('registration_number', '=', registration_number), ('owner_id', '=', int(owner_id))], limit=1)
 
             if not vehicle:
@@ -59,5 +119,114 @@ class VehicleController(http.Controller):
             vehicle.unlink()
 
             return {'status': 'Success', 'message': 'Vehicle deleted successfully'}
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    @http.route('/api/vehicle/batch_create', type='json', auth='none', methods=['POST'], csrf=False, cors="*")
+    @instrumented
+    @api_key_required()
+    def batch_create_vehicles(self, **kwargs):
+        try:
+            vehicles = kwargs.get('vehicles')
+            if not vehicles or not isinstance(vehicles, list):
+                return {'error': 'Invalid or missing vehicles list'}, 400
+
+            owner_ids = set()
+            for item in vehicles:
+                try:
+                    owner_ids.add(int(item.get('owner_id')))
+                except (AttributeError, TypeError, ValueError):
+                    pass
+            existing_owner_ids = set(request.env['res.partner'].sudo().browse(owner_ids).exists().ids)
+
+            results = [None] * len(vehicles)
+            to_create = []
+            for index, item in enumerate(vehicles):
+                if not isinstance(item, dict) or not item.get('name') or not item.get('registration_number') or not item.get('owner_id'):
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'Required field missing'}
+                elif not str(item['owner_id']).isdigit() or int(item['owner_id']) not in existing_owner_ids:
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'Partner not found'}
+                else:
+                    to_create.append((index, {
+                        'vehicle_name': item['name'],
+                        'registration_number': item['registration_number'],
+                        'model': item.get('model'),
+                        'registration_year': item.get('registration_year'),
+                        'colour': item.get('colour'),
+                        'owner_id': int(item['owner_id']),
+                    }))
+
+            created = create_with_fallback(request.env['vehicle.management'].sudo(), [vals for index, vals in to_create])
+            for (index, vals), vehicle in zip(to_create, created):
+                if isinstance(vehicle, Exception):
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': str(vehicle)}
+                else:
+                    results[index] = {'index': index, 'status': 'Success', 'vehicle_id': vehicle.id}
+
+            return {
+                'status': 'Success',
+                'created': sum(1 for result in results if result['status'] == 'Success'),
+                'failed': sum(1 for result in results if result['status'] == 'Failure'),
+                'results': results
+            }
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    @http.route('/api/vehicle/batch_delete', type='json', auth='none', methods=['DELETE'], csrf=False, cors="*")
+    @instrumented
+    @api_key_required()
+    def batch_delete_vehicles(self, **kwargs):
+        try:
+            vehicles = kwargs.get('vehicles')
+            if not vehicles or not isinstance(vehicles, list):
+                return {'error': 'Invalid or missing vehicles list'}, 400
+
+            results = [None] * len(vehicles)
+            keys = {}
+            for index, item in enumerate(vehicles):
+                if not isinstance(item, dict) or not item.get('registration_number') or not str(item.get('owner_id') or '').isdigit():
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'Required field missing'}
+                else:
+                    keys[index] = (int(item['owner_id']), item['registration_number'])
+
+            Vehicle = request.env['vehicle.management'].sudo()
+            candidates = Vehicle.search([
+                ('owner_id', 'in', list({owner_id for owner_id, registration_number in keys.values()})),
+                ('registration_number', 'in', list({registration_number for owner_id, registration_number in keys.values()})),
+            ]) if keys else Vehicle.browse()
+
+            wanted = set(keys.values())
+            vehicles_by_key = {}
+            for vehicle in candidates:
+                key = (vehicle.owner_id.id, vehicle.registration_number)
+                if key in wanted:
+                    vehicles_by_key[key] = vehicles_by_key.get(key, Vehicle.browse()) | vehicle
+
+            failed_keys = {}
+            try:
+                with request.env.cr.savepoint():
+                    Vehicle.browse([vehicle.id for key_vehicles in vehicles_by_key.values() for vehicle in key_vehicles]).unlink()
+            except Exception:
+                for key, key_vehicles in vehicles_by_key.items():
+                    try:
+                        with request.env.cr.savepoint():
+                            key_vehicles.unlink()
+                    except Exception as e:
+                        failed_keys[key] = str(e)
+
+            for index, key in keys.items():
+                if key not in vehicles_by_key:
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': 'Vehicle not found'}
+                elif key in failed_keys:
+                    results[index] = {'index': index, 'status': 'Failure', 'reason': failed_keys[key]}
+                else:
+                    results[index] = {'index': index, 'status': 'Success'}
+
+            return {
+                'status': 'Success',
+                'deleted': sum(1 for result in results if result['status'] == 'Success'),
+                'failed': sum(1 for result in results if result['status'] == 'Failure'),
+                'results': results
+            }
         except Exception as e:
             return {'error': str(e)}, 500
\ No newline at end of file
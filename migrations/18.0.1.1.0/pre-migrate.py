@@ -0,0 +1,7 @@
+def migrate(cr, version):
+    if not version:
+        return
+
+    # Codes used to be stored in clear text. They only live for five minutes,
+    # so drop them instead of hashing them; clients simply request a new one.
+    cr.execute("DELETE FROM customer_otp")
@@ -0,0 +1,25 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+
+    # unique(owner_id, registration_number) cannot be added while duplicates
+    # exist. Keep the oldest vehicle of each pair and suffix the others so
+    # nothing is lost and they can be reviewed by hand.
+    cr.execute("""
+        UPDATE vehicle_management v
+           SET registration_number = v.registration_number || ' (duplicate ' || v.id || ')'
+          FROM (SELECT id, row_number() OVER (PARTITION BY owner_id, registration_number ORDER BY id) AS rank
+                  FROM vehicle_management
+                 WHERE owner_id IS NOT NULL) d
+         WHERE d.id = v.id
+           AND d.rank > 1
+     RETURNING v.id
+    """)
+    renamed = [row[0] for row in cr.fetchall()]
+    if renamed:
+        _logger.warning("Renamed %d duplicate vehicle registration numbers: ids %s", len(renamed), renamed)
@@ -0,0 +1,27 @@
+def migrate(cr, version):
+    if not version:
+        return
+
+    # Create the new stored columns ourselves so the ORM does not recompute
+    # them partner by partner on upgrade. The temporary default fills
+    # existing rows without rewriting the table.
+    cr.execute("""
+        ALTER TABLE res_partner
+            ADD COLUMN IF NOT EXISTS vehicle_count integer DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS has_vehicles boolean DEFAULT false
+    """)
+    cr.execute("""
+        ALTER TABLE res_partner
+            ALTER COLUMN vehicle_count DROP DEFAULT,
+            ALTER COLUMN has_vehicles DROP DEFAULT
+    """)
+    cr.execute("""
+        UPDATE res_partner p
+           SET vehicle_count = v.count,
+               has_vehicles = true
+          FROM (SELECT owner_id, count(*) AS count
+                  FROM vehicle_management
+                 WHERE owner_id IS NOT NULL
+              GROUP BY owner_id) v
+         WHERE v.owner_id = p.id
+    """)
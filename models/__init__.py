@@ -1,3 +1,15 @@
+from . import api_access_key
+from . import api_idempotency_key
+from . import mail_mail
 from . import otp_model
+from . import product_api_pricing
+from . import product_api_serializer
+from . import product_api_tombstone
+from . import product_product
+from . import product_stock_snapshot
 from . import product_template_inherited
+from . import res_users_provisioning
+from . import sale_order_api_builder
+from . import sale_order_fulfillment_job
+from . import stock_quant
 from . import vehicle
\ No newline at end of file
@@ -0,0 +1,64 @@
+from odoo import fields, models, api, tools
+import hashlib
+import hmac
+import secrets
+
+
+class APIAccessKey(models.Model):
+    _name = 'api.access.key'
+    _description = 'API Access Key'
+
+    name = fields.Char(string='Client', required=True)
+    key_hash = fields.Char(string='Key Hash', required=True, index=True, copy=False)
+    active = fields.Boolean(default=True)
+
+    _sql_constraints = [
+        ('key_hash_unique', 'unique(key_hash)', 'This API key is already registered.'),
+    ]
+
+    @api.model
+    def _hash_key(self, key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @api.model
+    def register_key(self, name, key=None):
+        key = key or secrets.token_urlsafe(32)
+        self.sudo().create({'name': name, 'key_hash': self._hash_key(key)})
+        return key
+
+    @api.model
+    @tools.ormcache()
+    def _get_key_hashes(self):
+        # ir.config_parameter clears the registry cache on every write, so the
+        # legacy shared key is picked up here as soon as it changes.
+        key_hashes = self.sudo().search([]).mapped('key_hash')
+        legacy_key = self.env['ir.config_parameter'].sudo().get_param('api.product_access_key')
+        if legacy_key:
+            key_hashes.append(self._hash_key(legacy_key))
+        return tuple(key_hashes)
+
+    @api.model
+    def _check_api_key(self, token):
+        if not token:
+            return False
+        token_hash = self._hash_key(token)
+        valid = False
+        for key_hash in self._get_key_hashes():
+            valid |= hmac.compare_digest(token_hash, key_hash)
+        return valid
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
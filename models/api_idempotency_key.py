@@ -0,0 +1,54 @@
+from odoo import fields, models, api
+from datetime import timedelta
+import hashlib
+import json
+import psycopg2
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+
+class APIIdempotencyKey(models.Model):
+    _name = 'api.idempotency.key'
+    _description = 'API Idempotency Key'
+
+    key = fields.Char(required=True)
+    route = fields.Char(required=True)
+    request_hash = fields.Char(required=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+    ], default='pending', required=True)
+    response = fields.Json()
+    status_code = fields.Integer()
+
+    _sql_constraints = [
+        ('key_route_unique', 'unique(key, route)', 'This idempotency key has already been used for this route.'),
+    ]
+
+    @api.model
+    def _hash_request(self, params):
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+    @api.model
+    def reserve(self, key, route, request_hash):
+        try:
+            with self.env.cr.savepoint():
+                record = self.create({'key': key, 'route': route, 'request_hash': request_hash})
+                record.flush_recordset()
+        except psycopg2.IntegrityError:
+            return self.browse()
+        return record
+
+    def store_response(self, response, status_code):
+        self.ensure_one()
+        self.write({'state': 'done', 'response': response, 'status_code': status_code})
+
+    def get_response(self):
+        self.ensure_one()
+        if self.status_code == 200:
+            return self.response
+        return self.response, self.status_code
+
+    @api.autovacuum
+    def _gc_expired_keys(self):
+        self.search([('create_date', '<', fields.Datetime.now() - IDEMPOTENCY_KEY_TTL)]).unlink()
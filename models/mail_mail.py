@@ -0,0 +1,56 @@
+from odoo import fields, models, api
+from datetime import timedelta
+
+API_MAIL_MAX_RETRIES = 5
+API_MAIL_RETRY_BASE_DELAY = timedelta(minutes=5)
+
+
+class MailMail(models.Model):
+    _inherit = 'mail.mail'
+
+    is_api_mail = fields.Boolean(index=True, default=False)
+    api_retry_count = fields.Integer(default=0)
+
+    @api.model
+    def queue_api_mail(self, values):
+        mail = self.sudo().create(dict(values, is_api_mail=True))
+        self._trigger_api_mail_sender()
+        return mail
+
+    @api.model
+    def process_email_queue(self, ids=None, batch_size=1000):
+        # API mails have their own sender cron; keep the core mail scheduler
+        # from picking up the same rows.
+        if not ids:
+            filters = list(self.env.context.get('filters') or []) + [('is_api_mail', '=', False)]
+            self = self.with_context(filters=filters)
+        return super().process_email_queue(ids=ids, batch_size=batch_size)
+
+    @api.model
+    def _trigger_api_mail_sender(self):
+        self.env.ref('product_rest_api.ir_cron_send_api_mails')._trigger()
+
+    @api.model
+    def _cron_send_api_mails(self, batch_size=100):
+        now = fields.Datetime.now()
+        failed = self.sudo().search([
+            ('is_api_mail', '=', True),
+            ('state', '=', 'exception'),
+            ('api_retry_count', '<', API_MAIL_MAX_RETRIES),
+        ])
+        for mail in failed:
+            if mail.write_date + API_MAIL_RETRY_BASE_DELAY * (2 ** mail.api_retry_count) <= now:
+                mail.write({'state': 'outgoing', 'api_retry_count': mail.api_retry_count + 1})
+
+        mails = self.sudo().search([
+            ('is_api_mail', '=', True),
+            ('state', '=', 'outgoing'),
+            '|', ('scheduled_date', '=', False), ('scheduled_date', '<=', now),
+        ], limit=batch_size)
+        # process_email_queue sends with auto_commit, so mails handed to SMTP
+        # stay sent even if this cron transaction fails afterwards.
+        if mails:
+            self.sudo().process_email_queue(ids=mails.ids)
+
+        if len(mails) == batch_size:
+            self._trigger_api_mail_sender()
@@ -1,29 +1,95 @@
 from odoo import models, fields, api
-import random
+from odoo.tools.sql import create_index
+import hashlib
+import hmac
+import secrets
 import string
 from datetime import datetime, timedelta
 
+from ..tools.rate_limit import TokenBucketLimiter
+
+OTP_VALIDITY = timedelta(minutes=5)
+OTP_RATE_WINDOW = timedelta(minutes=15)
+OTP_MAX_PER_EMAIL = 3
+OTP_MAX_PER_IP = 10
+OTP_GC_BATCH_SIZE = 1000
+
+email_limiter = TokenBucketLimiter(OTP_MAX_PER_EMAIL, OTP_RATE_WINDOW.total_seconds())
+ip_limiter = TokenBucketLimiter(OTP_MAX_PER_IP, OTP_RATE_WINDOW.total_seconds())
+
 class CustomerOTP(models.Model):
     _name = 'customer.otp'
     _description = 'Customer OTP Verification'
 
     email = fields.Char(required=True, index=True)
-    otp = fields.Char(required=True)
+    otp_hash = fields.Char(required=True)
     expiration_time = fields.Datetime(required=True)
     is_verified = fields.Boolean(default=False)
+    ip_address = fields.Char(index=True)
+    send_count = fields.Integer(default=1)
+    window_start = fields.Datetime(required=True, default=fields.Datetime.now)
+
+    def init(self):
+        create_index(self.env.cr, 'customer_otp_email_expiration_time_index', self._table, ['email', 'expiration_time'])
+
+    @api.model
+    def _hash_otp(self, email, otp):
+        secret = self.env['ir.config_parameter'].sudo().get_param('database.secret')
+        return hmac.new(secret.encode(), f'{email}:{otp}'.encode(), hashlib.sha256).hexdigest()
 
     @api.model
-    def generate_otp(self, email):
-        self.env['customer.otp'].search([('email', '=', email)]).unlink()
-        otp_code = ''.join(random.choices(string.digits, k=6))
-        expiration = datetime.now() + timedelta(minutes=5)
-        otp_record = self.create({'email': email, 'otp': otp_code, 'expiration_time': expiration})
-        return otp_record
+    def check_rate_limit(self, email, ip_address=None):
+        if not email_limiter.consume(email):
+            return False
+        if ip_address and not ip_limiter.consume(ip_address):
+            return False
+
+        # The in-memory buckets are per worker; the table gives the same
+        # limits across workers and restarts.
+        window_start = datetime.now() - OTP_RATE_WINDOW
+        existing = self.search([('email', '=', email)], limit=1)
+        if existing and existing.window_start > window_start and existing.send_count >= OTP_MAX_PER_EMAIL:
+            return False
+        if ip_address and self.search_count(
+                [('ip_address', '=', ip_address), ('write_date', '>', window_start)]) >= OTP_MAX_PER_IP:
+            return False
+        return True
+
+    @api.model
+    def generate_otp(self, email, ip_address=None):
+        otp_code = ''.join(secrets.choice(string.digits) for i in range(6))
+        now = datetime.now()
+        values = {
+            'otp_hash': self._hash_otp(email, otp_code),
+            'expiration_time': now + OTP_VALIDITY,
+            'is_verified': False,
+            'ip_address': ip_address,
+        }
+
+        otp_record = self.search([('email', '=', email)], limit=1)
+        if not otp_record:
+            self.create(dict(values, email=email, send_count=1, window_start=now))
+        elif otp_record.window_start <= now - OTP_RATE_WINDOW:
+            otp_record.write(dict(values, send_count=1, window_start=now))
+        else:
+            otp_record.write(dict(values, send_count=otp_record.send_count + 1))
+        return otp_code
 
     def validate_otp(self, email, otp):
-        otp_record = self.search([('email', '=', email), ('otp', '=', otp), ('expiration_time', '>', datetime.now())], limit=1)
+        otp_record = self.search([('email', '=', email), ('expiration_time', '>', datetime.now()), ('is_verified', '=', False)], limit=1)
 
-        if otp_record:
+        if otp_record and hmac.compare_digest(otp_record.otp_hash, self._hash_otp(email, otp)):
             otp_record.write({'is_verified': True})
-            return True
-        return False
\ No newline at end of file
+            return otp_record
+        return self.browse()
+
+    @api.model
+    def _gc_expired_otps(self, batch_size=OTP_GC_BATCH_SIZE):
+        # Rows stay until the rate limit window is over so the database
+        # fallback still sees recent sends.
+        expired = self.search([('expiration_time', '<', datetime.now() - OTP_RATE_WINDOW)], limit=batch_size)
+        expired.unlink()
+        email_limiter.prune()
+        ip_limiter.prune()
+        if len(expired) == batch_size:
+            self.env.ref('product_rest_api.ir_cron_gc_expired_otps')._trigger()
@@ -0,0 +1,34 @@
+from odoo import api, models
+from collections import defaultdict
+
+
+class ProductAPIPricing(models.AbstractModel):
+    _name = 'product.api.pricing'
+    _description = 'Product API Pricing'
+
+    @api.model
+    def get_pricelist(self, partner=None, pricelist=None):
+        if pricelist:
+            return pricelist
+        if partner:
+            return partner.property_product_pricelist
+        return self.env['product.pricelist']
+
+    @api.model
+    def compute_prices(self, items, pricelist, date=False):
+        if not pricelist:
+            return [product.lst_price for product, quantity in items]
+
+        # _compute_price_rule prices a whole recordset for one quantity, so
+        # the pricelist engine runs once per distinct quantity.
+        products_by_quantity = defaultdict(lambda: self.env['product.product'])
+        for product, quantity in items:
+            products_by_quantity[quantity] |= product
+
+        prices = {}
+        for quantity, products in products_by_quantity.items():
+            results = pricelist._compute_price_rule(products, quantity, date=date)
+            for product_id, (price, rule_id) in results.items():
+                prices[product_id, quantity] = price
+
+        return [prices[product.id, quantity] for product, quantity in items]
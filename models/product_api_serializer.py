@@ -0,0 +1,82 @@
+from odoo import api, models
+
+PRODUCT_API_FIELDS = ('id', 'name', 'reference_code', 'image_url', 'on_hand_qty', 'unit_price')
+PRODUCT_API_INCLUDES = ('stock_by_location', 'pricelist_price')
+PRODUCT_API_READ_FIELDS = {
+    'name': 'name',
+    'reference_code': 'default_code',
+    'unit_price': 'lst_price',
+}
+
+
+class ProductAPISerializer(models.AbstractModel):
+    _name = 'product.api.serializer'
+    _description = 'Product API Serializer'
+
+    @api.model
+    def serialize_products(self, products, base_url, fields=None, include=None, pricelist=None):
+        if not products:
+            return []
+
+        fields = [name for name in (fields or PRODUCT_API_FIELDS) if name != 'id']
+        include = list(include or [])
+        options = {'base_url': base_url, 'pricelist': pricelist}
+
+        columns = {}
+        read_fields = [name for name in fields if name in PRODUCT_API_READ_FIELDS]
+        if read_fields:
+            rows = products.read([PRODUCT_API_READ_FIELDS[name] for name in read_fields])
+            for name in read_fields:
+                columns[name] = {row['id']: row[PRODUCT_API_READ_FIELDS[name]] for row in rows}
+
+        for name in fields + include:
+            if name not in columns:
+                columns[name] = getattr(self, f'_fetch_{name}')(products, options)
+
+        return [
+            dict({'id': product_id}, **{name: columns[name][product_id] for name in fields + include})
+            for product_id in products.ids
+        ]
+
+    @api.model
+    def _fetch_on_hand_qty(self, products, options):
+        quant_domain = products._get_domain_locations()[0]
+        groups = self.env['stock.quant'].sudo()._read_group(
+            [('product_id', 'in', products.ids)] + quant_domain,
+            ['product_id'],
+            ['quantity:sum'],
+        )
+        quantities = dict.fromkeys(products.ids, 0.0)
+        quantities.update({product.id: quantity for product, quantity in groups})
+        return quantities
+
+    @api.model
+    def _fetch_image_url(self, products, options):
+        templates = {product.id: product.product_tmpl_id.id for product in products}
+        attachments = self.env['ir.attachment'].sudo().search_read(
+            ['|',
+             '&', '&', ('res_model', '=', 'product.product'), ('res_field', '=', 'image_variant_1920'), ('res_id', 'in', products.ids),
+             '&', '&', ('res_model', '=', 'product.template'), ('res_field', '=', 'image_1920'), ('res_id', 'in', list(set(templates.values())))],
+            ['res_model', 'res_id'],
+        )
+        variants_with_image = {att['res_id'] for att in attachments if att['res_model'] == 'product.product'}
+        templates_with_image = {att['res_id'] for att in attachments if att['res_model'] == 'product.template'}
+
+        base_url = options['base_url']
+        return {
+            product_id: f"{base_url}/api/product/image/{product_id}"
+            if product_id in variants_with_image or template_id in templates_with_image else None
+            for product_id, template_id in templates.items()
+        }
+
+    @api.model
+    def _fetch_stock_by_location(self, products, options):
+        return self.env['product.stock.snapshot'].get_snapshot(products)
+
+    @api.model
+    def _fetch_pricelist_price(self, products, options):
+        pricelist = options['pricelist']
+        if not pricelist:
+            return dict.fromkeys(products.ids)
+        prices = self.env['product.api.pricing'].compute_prices([(product, 1.0) for product in products], pricelist)
+        return dict(zip(products.ids, prices))
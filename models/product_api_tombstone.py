@@ -0,0 +1,28 @@
+from odoo import fields, models, api
+from datetime import timedelta
+
+# Delta-sync clients must sync at least this often; older changed_since
+# values are refused by /api/products/changes and need a full resync.
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+
+class ProductAPITombstone(models.Model):
+    _name = 'product.api.tombstone'
+    _description = 'Deleted Product Record for API Delta Sync'
+    _order = 'deleted_at, id'
+
+    product_id = fields.Integer(string='Product ID', required=True)
+    reference_code = fields.Char(string='Reference Code')
+    deleted_at = fields.Datetime(string='Deleted At', required=True, index=True, default=fields.Datetime.now)
+
+    @api.model
+    def record_deleted_products(self, products):
+        if products:
+            self.sudo().create([{
+                'product_id': product.id,
+                'reference_code': product.default_code,
+            } for product in products])
+
+    @api.autovacuum
+    def _gc_expired_tombstones(self):
+        self.search([('deleted_at', '<', fields.Datetime.now() - TOMBSTONE_RETENTION)]).unlink()
@@ -0,0 +1,31 @@
+from odoo import api, models
+from odoo.tools.sql import create_index
+
+from ..tools.response_cache import invalidate_product_cache
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    def init(self):
+        super().init()
+        # default_code already has a btree index for equality lookups; the
+        # trigram index serves prefix and substring ILIKE searches.
+        if self.env.registry.has_trigram:
+            create_index(self.env.cr, 'product_product_default_code_trgm_index', self._table,
+                         ['default_code gin_trgm_ops'], method='gin')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        invalidate_product_cache(self.env)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        invalidate_product_cache(self.env)
+        return super().write(vals)
+
+    def unlink(self):
+        invalidate_product_cache(self.env)
+        if not self.env.context.get('api_tombstone_recorded'):
+            self.env['product.api.tombstone'].record_deleted_products(self)
+        return super().unlink()
@@ -0,0 +1,66 @@
+from odoo import api, models
+
+OPEN_MOVE_STATES = ('waiting', 'confirmed', 'partially_available', 'assigned')
+
+
+class ProductStockSnapshot(models.AbstractModel):
+    _name = 'product.stock.snapshot'
+    _description = 'Per-Location Product Stock Snapshot'
+
+    @api.model
+    def get_snapshot(self, products):
+        snapshot = {product_id: {} for product_id in products.ids}
+        if not products:
+            return snapshot
+
+        def entry(product_id, location):
+            return snapshot[product_id].setdefault(location, {
+                'on_hand': 0.0,
+                'reserved': 0.0,
+                'incoming': 0.0,
+                'outgoing': 0.0,
+            })
+
+        quant_groups = self.env['stock.quant'].sudo()._read_group(
+            [('product_id', 'in', products.ids), ('location_id.usage', '=', 'internal')],
+            ['product_id', 'location_id'],
+            ['quantity:sum', 'reserved_quantity:sum'],
+        )
+        for product, location, quantity, reserved in quant_groups:
+            values = entry(product.id, location)
+            values['on_hand'] = quantity
+            values['reserved'] = reserved
+
+        move_groups = self.env['stock.move'].sudo()._read_group(
+            [('product_id', 'in', products.ids), ('state', 'in', OPEN_MOVE_STATES),
+             '|', ('location_id.usage', '=', 'internal'), ('location_dest_id.usage', '=', 'internal')],
+            ['product_id', 'location_id', 'location_dest_id'],
+            ['product_qty:sum'],
+        )
+        for product, source, destination, quantity in move_groups:
+            if source == destination:
+                continue
+            if destination.usage == 'internal':
+                entry(product.id, destination)['incoming'] += quantity
+            if source.usage == 'internal':
+                entry(product.id, source)['outgoing'] += quantity
+
+        return {
+            product_id: [self._format_location(location, values) for location, values in locations.items()]
+            for product_id, locations in snapshot.items()
+        }
+
+    @api.model
+    def _format_location(self, location, values):
+        return {
+            'location_id': location.id,
+            'location': location.display_name,
+            'warehouse_id': location.warehouse_id.id or None,
+            'warehouse': location.warehouse_id.name or None,
+            'on_hand': values['on_hand'],
+            'reserved': values['reserved'],
+            'available': values['on_hand'] - values['reserved'],
+            'incoming': values['incoming'],
+            'outgoing': values['outgoing'],
+            'forecast': values['on_hand'] + values['incoming'] - values['outgoing'],
+        }
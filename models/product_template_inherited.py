@@ -1,8 +1,12 @@
-from odoo import api, models, _
+from odoo import api, fields, models, _
+
+from ..tools.response_cache import invalidate_product_cache
 
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
 
+    default_code = fields.Char(index=True)
+
     @api.onchange('default_code')
     def _onchange_default_code_changed(self):
         if not self.default_code:
@@ -25,3 +29,18 @@ class ProductTemplate(models.Model):
                     ) % duplicate,
                 }
             }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        invalidate_product_cache(self.env)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        invalidate_product_cache(self.env)
+        return super().write(vals)
+
+    def unlink(self):
+        invalidate_product_cache(self.env)
+        variants = self.with_context(active_test=False).product_variant_ids
+        self.env['product.api.tombstone'].record_deleted_products(variants)
+        return super(ProductTemplate, self.with_context(api_tombstone_recorded=True)).unlink()
@@ -0,0 +1,70 @@
+from odoo import api, models, tools
+import secrets
+import string
+
+PASSWORD_CHARACTERS = string.ascii_letters + string.digits + "!@#$%&*"
+
+
+class ResUsersAPIProvisioning(models.AbstractModel):
+    _name = 'res.users.api.provisioning'
+    _description = 'API Customer Account Provisioning'
+
+    @api.model
+    @tools.ormcache()
+    def _get_provisioning_refs(self):
+        Users = self.env['res.users'].sudo()
+        admin_user = self.env.ref('base.user_admin', raise_if_not_found=False)
+        if not admin_user or not admin_user.exists():
+            admin_user = Users.search([('id', '=', 2)], limit=1)
+        if not admin_user or not admin_user.exists():
+            admin_user = Users.search([('id', '=', 1)], limit=1)
+
+        company = self.env['res.company'].sudo().browse(1).exists()
+        portal_group = self.env.ref('base.group_portal', raise_if_not_found=False)
+        return admin_user.id or False, company.id or False, portal_group.id if portal_group else False
+
+    @api.model
+    def get_admin_user(self):
+        return self.env['res.users'].sudo().browse(self._get_provisioning_refs()[0] or [])
+
+    @api.model
+    def generate_password(self):
+        return ''.join(secrets.choice(PASSWORD_CHARACTERS) for i in range(12))
+
+    @api.model
+    def check_configuration(self):
+        admin_id, company_id, portal_group_id = self._get_provisioning_refs()
+        if not admin_id:
+            return 'No admin user found'
+        if not company_id:
+            return 'No company found'
+        if not portal_group_id:
+            return 'Portal group not found'
+        return None
+
+    @api.model
+    def prepare_user_vals(self, name, email, password):
+        admin_id, company_id, portal_group_id = self._get_provisioning_refs()
+        # res.users delegates partner fields through _inherits, so the partner
+        # is created with its customer flags in the same create.
+        return {
+            'name': name,
+            'login': email,
+            'email': email,
+            'password': password,
+            'company_id': company_id,
+            'company_ids': [(6, 0, [company_id])],
+            'groups_id': [(6, 0, [portal_group_id])],
+            'active': True,
+            'share': True,
+            'is_company': False,
+            'customer_rank': 1,
+        }
+
+    @api.model
+    def get_users_model(self):
+        return self.env['res.users'].with_user(self.get_admin_user()).sudo()
+
+    @api.model
+    def create_users(self, vals_list):
+        return self.get_users_model().create(vals_list)
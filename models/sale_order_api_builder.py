@@ -0,0 +1,124 @@
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import float_compare
+from collections import defaultdict
+
+
+class SaleOrderAPIBuilder(models.AbstractModel):
+    _name = 'sale.order.api.builder'
+    _description = 'Sale Order API Builder'
+
+    @api.model
+    def resolve_products(self, codes):
+        products = self.env['product.product'].sudo().search([('default_code', 'in', list(set(codes)))])
+        products_by_code = {}
+        for product in products:
+            products_by_code.setdefault(product.default_code, product)
+        return products_by_code
+
+    @api.model
+    def create_order(self, user, order_vals, lines, products_by_code):
+        return self.create_orders(user, [(order_vals, lines)], products_by_code)
+
+    @api.model
+    def create_orders(self, user, orders, products_by_code):
+        sale_orders = self.env['sale.order'].with_user(user).sudo().create([order_vals for order_vals, lines in orders])
+
+        items_by_order = [
+            [(products_by_code[line['product_code']], float(line.get('quantity', 1))) for line in lines]
+            for order_vals, lines in orders
+        ]
+
+        # Orders sharing a pricelist are priced in one pass.
+        orders_by_pricelist = defaultdict(list)
+        for position, sale_order in enumerate(sale_orders):
+            orders_by_pricelist[sale_order.pricelist_id].append(position)
+
+        prices_by_order = {}
+        pricing = self.env['product.api.pricing']
+        for pricelist, positions in orders_by_pricelist.items():
+            items = [item for position in positions for item in items_by_order[position]]
+            prices = iter(pricing.compute_prices(items, pricelist, date=sale_orders[positions[0]].date_order))
+            for position in positions:
+                prices_by_order[position] = [next(prices) for item in items_by_order[position]]
+
+        self.env['sale.order.line'].with_user(user).sudo().create([
+            self._prepare_line_vals(sale_order, product, quantity, price)
+            for position, sale_order in enumerate(sale_orders)
+            for (product, quantity), price in zip(items_by_order[position], prices_by_order[position])
+        ])
+        return sale_orders
+
+    @api.model
+    def _prepare_line_vals(self, sale_order, product, quantity, price_unit):
+        return {
+            'order_id': sale_order.id,
+            'product_id': product.id,
+            'product_uom_qty': quantity,
+            'price_unit': price_unit,
+            # price_unit is already net of the pricelist discount; keep the
+            # line from applying it a second time.
+            'discount': 0.0,
+            'name': product.name,
+        }
+
+    @api.model
+    def fulfill_paid_order(self, sale_order, user, journal=None):
+        if sale_order.state == 'draft':
+            sale_order.with_user(user).action_confirm()
+
+        pickings = sale_order.picking_ids.filtered(lambda p: p.state not in ['done', 'cancel'])
+        if pickings:
+            self._validate_pickings(pickings)
+
+        invoice = sale_order._create_invoices()
+        invoice = invoice and invoice.exists() and invoice[0] or None
+
+        if invoice:
+            invoice.action_post()
+
+            journal = journal or self.env['account.journal'].sudo().search([('type', '=', 'bank')], limit=1)
+            if not journal:
+                raise UserError(_('No bank journal found'))
+
+            payment_wizard = self.env['account.payment.register'].sudo().with_context(
+                active_model='account.move',
+                active_ids=invoice.ids
+            ).create({
+                'payment_date': fields.Date.today(),
+                'journal_id': journal.id,
+                'amount': invoice.amount_total,
+            })
+            payment_wizard.action_create_payments()
+
+        return invoice
+
+    @api.model
+    def _validate_pickings(self, pickings):
+        pickings.action_confirm()
+        pickings.action_assign()
+
+        # Reserved move lines already carry their quantity; only the part
+        # that could not be reserved needs new lines.
+        moves = pickings.move_ids.filtered(lambda m: m.state not in ['done', 'cancel'])
+
+        missing_line_vals = []
+        for move in moves:
+            remaining = move.product_uom_qty - move.quantity
+            if float_compare(remaining, 0, precision_rounding=move.product_uom.rounding) > 0:
+                missing_line_vals.append({
+                    'move_id': move.id,
+                    'picking_id': move.picking_id.id,
+                    'product_id': move.product_id.id,
+                    'product_uom_id': move.product_uom.id,
+                    'quantity': remaining,
+                    'picked': True,
+                    'location_id': move.location_id.id,
+                    'location_dest_id': move.location_dest_id.id,
+                })
+        if missing_line_vals:
+            self.env['stock.move.line'].sudo().create(missing_line_vals)
+
+        # Marking the moves picked also marks all their lines in one write.
+        moves.write({'picked': True})
+        pickings.with_context(skip_backorder=True).button_validate()
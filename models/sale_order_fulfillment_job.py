@@ -0,0 +1,58 @@
+from odoo import fields, models, api
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+MAX_FULFILLMENT_ATTEMPTS = 3
+
+
+class SaleOrderFulfillmentJob(models.Model):
+    _name = 'sale.order.fulfillment.job'
+    _description = 'Queued Fulfillment of a Paid API Sale Order'
+    _order = 'id'
+
+    sale_order_id = fields.Many2one('sale.order', string='Sale Order', required=True, index=True, ondelete='cascade')
+    user_id = fields.Many2one('res.users', string='Run As', required=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], default='pending', required=True, index=True)
+    attempts = fields.Integer(default=0)
+    error = fields.Text()
+    invoice_id = fields.Many2one('account.move', string='Invoice')
+
+    @api.model
+    def enqueue(self, sale_order, user):
+        job = self.create({'sale_order_id': sale_order.id, 'user_id': user.id})
+        self.env.ref('product_rest_api.ir_cron_process_fulfillment_jobs')._trigger()
+        return job
+
+    @api.model
+    def _cron_process_jobs(self, batch_size=50):
+        jobs = self.search([('state', '=', 'pending')], limit=batch_size)
+        builder = self.env['sale.order.api.builder'].sudo()
+        journal = self.env['account.journal'].sudo().search([('type', '=', 'bank')], limit=1)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+
+        for job in jobs:
+            try:
+                with self.env.cr.savepoint():
+                    invoice = builder.fulfill_paid_order(job.sale_order_id, job.user_id, journal=journal)
+                job.write({'state': 'done', 'error': False, 'invoice_id': invoice.id if invoice else False})
+            except Exception as e:
+                _logger.warning("Fulfillment of %s failed: %s", job.sale_order_id.name, e)
+                attempts = job.attempts + 1
+                job.write({
+                    'attempts': attempts,
+                    'error': str(e),
+                    'state': 'failed' if attempts >= MAX_FULFILLMENT_ATTEMPTS else 'pending',
+                })
+            # Release the quant, picking and sequence locks taken by this
+            # order before starting the next one.
+            if auto_commit:
+                self.env.cr.commit()
+
+        if len(jobs) == batch_size:
+            self.env.ref('product_rest_api.ir_cron_process_fulfillment_jobs')._trigger()
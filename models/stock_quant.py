@@ -0,0 +1,20 @@
+from odoo import api, models
+
+from ..tools.response_cache import invalidate_product_cache
+
+
+class StockQuant(models.Model):
+    _inherit = 'stock.quant'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        invalidate_product_cache(self.env)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        invalidate_product_cache(self.env)
+        return super().write(vals)
+
+    def unlink(self):
+        invalidate_product_cache(self.env)
+        return super().unlink()
@@ -5,22 +5,34 @@ class Vehicle(models.Model):
     _description = 'Vehicle Management and Description'
 
     vehicle_name = fields.Char(string='Vehicle Name', required=True)
-    registration_number = fields.Char(string='Registration Number', required=True)
-    model = fields.Char(string='Model')
+    registration_number = fields.Char(string='Registration Number', required=True, index=True)
+    model = fields.Char(string='Model', index=True)
     registration_year = fields.Char(string='Registration Year')
     colour = fields.Char(string='Colour')
-    owner_id = fields.Many2one('res.partner', string='Owner', ondelete='cascade')
+    owner_id = fields.Many2one('res.partner', string='Owner', ondelete='cascade', index=True)
+
+    _sql_constraints = [
+        ('owner_registration_number_unique', 'unique(owner_id, registration_number)',
+         'This owner already has a vehicle with this registration number.'),
+    ]
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
 
     vehicle_ids = fields.One2many('vehicle.management', 'owner_id', string='Vehicles')
-    has_vehicles = fields.Boolean(compute="_compute_has_vehicles")
+    vehicle_count = fields.Integer(compute="_compute_vehicle_count", store=True, index=True)
+    has_vehicles = fields.Boolean(compute="_compute_vehicle_count", store=True, index=True)
 
     @api.depends('vehicle_ids')
-    def _compute_has_vehicles(self):
+    def _compute_vehicle_count(self):
+        # Recomputed by the ORM only for the owners touched by a vehicle
+        # create, owner change or unlink; one grouped count per batch.
+        groups = self.env['vehicle.management']._read_group(
+            [('owner_id', 'in', self._origin.ids)], ['owner_id'], ['__count'])
+        counts = {owner.id: count for owner, count in groups}
         for rec in self:
-            rec.has_vehicles = bool(rec.vehicle_ids)
+            rec.vehicle_count = counts.get(rec._origin.id, 0) if rec._origin else len(rec.vehicle_ids)
+            rec.has_vehicles = bool(rec.vehicle_count)
 
     def action_open_vehicles(self):
         self.ensure_one()
@@ -0,0 +1,222 @@
+import base64
+import json
+import logging
+import os
+import time
+
+from odoo.tests import HttpCase, tagged
+
+from ..controllers.common import encode_cursor
+from ..tools.metrics import route_metrics
+from ..tools.response_cache import product_response_cache
+
+_logger = logging.getLogger(__name__)
+
+# Run with: odoo-bin -i product_rest_api --test-tags product_api_benchmark
+# and e.g. PRODUCT_API_BENCH_SCALES=1000,10000,100000 for the larger catalogs.
+BENCH_SCALES = [int(scale) for scale in os.environ.get('PRODUCT_API_BENCH_SCALES', '1000').split(',')]
+BENCH_ITERATIONS = int(os.environ.get('PRODUCT_API_BENCH_ITERATIONS', '20'))
+SEED_CHUNK_SIZE = 1000
+
+# Maximum average SQL queries per request. Tighten them when a change makes
+# a route cheaper, never loosen them to make a regression pass.
+QUERY_BUDGETS = {
+    'ProductAPIController.get_products': 20,
+    'ProductAPIController.get_product_by_id': 20,
+    'ProductAPIController.get_product_image': 10,
+    'SaleOrderAPIController.create_order': 80,
+    'SaleOrderAPIController.track_order': 25,
+    'SaleOrderAPIController.track_orders': 25,
+    'VehicleController.list_vehicles': 10,
+    'VehicleController.create_vehicle': 15,
+    'VehicleController.delete_vehicle': 15,
+}
+PAID_ORDER_QUERY_BUDGET = 600
+TRACK_BATCH_SIZE = 50
+
+# 1x1 transparent PNG
+PIXEL_PNG = base64.b64encode(bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6300010000000500010d0a2db40000000049454e44ae426082'
+))
+
+
+@tagged('-standard', 'post_install', '-at_install', 'product_api_benchmark')
+class TestAPIBenchmarks(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.api_key = cls.env['api.access.key'].register_key('benchmark')
+        cls.stock_location = cls.env.ref('stock.stock_location_stock')
+        cls.category = cls.env['product.category'].create({'name': 'Benchmark'})
+        cls.customers = cls.env['res.partner'].create([{
+            'name': f'Benchmark Customer {index}',
+            'customer_rank': 1,
+        } for index in range(50)])
+        cls.env['account.journal'].search([('type', '=', 'bank')], limit=1) or cls.env['account.journal'].create({
+            'name': 'Benchmark Bank',
+            'code': 'BBNK',
+            'type': 'bank',
+        })
+        cls.catalog_size = 0
+
+    def _seed_catalog(self, size):
+        while self.catalog_size < size:
+            count = min(SEED_CHUNK_SIZE, size - self.catalog_size)
+            products = self.env['product.product'].create([{
+                'name': f'Benchmark Product {index}',
+                'default_code': f'BENCH-{index:06d}',
+                'list_price': 10.0 + index % 100,
+                'is_storable': True,
+                'categ_id': self.category.id,
+                'image_1920': PIXEL_PNG if index % 10 == 0 else False,
+            } for index in range(self.catalog_size, self.catalog_size + count)])
+            self.env['stock.quant'].create([{
+                'product_id': product.id,
+                'location_id': self.stock_location.id,
+                'quantity': 1000.0,
+            } for product in products])
+            self.catalog_size += count
+            self.env.invalidate_all()
+
+    def _request(self, method, route, params=None, headers=None, json_rpc=True):
+        headers = dict({'X-API-Key': self.api_key}, **(headers or {}))
+        data = None
+        if json_rpc:
+            headers['Content-Type'] = 'application/json'
+            data = json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': params or {}})
+        start = time.perf_counter()
+        response = self.opener.request(method, self.base_url() + route, data=data, headers=headers,
+                                       params=None if json_rpc else params, timeout=120)
+        elapsed = time.perf_counter() - start
+        self.assertLess(response.status_code, 500, f"{route} failed: {response.text[:500]}")
+        if json_rpc:
+            payload = response.json()
+            self.assertNotIn('error', payload, f"{route} failed: {payload.get('error')}")
+            result = payload['result']
+            # Handlers report errors as a [body, status] pair.
+            self.assertFalse(isinstance(result, list) and len(result) == 2 and isinstance(result[1], int),
+                             f"{route} failed: {result}")
+            return result, elapsed
+        return response, elapsed
+
+    def _benchmark(self, endpoint, label, call, iterations=BENCH_ITERATIONS, budget=None):
+        route_metrics.reset()
+        timings = []
+        for iteration in range(iterations):
+            product_response_cache.invalidate(self.env.cr.dbname)
+            timings.append(call(iteration))
+        stats = route_metrics.snapshot(endpoint)
+
+        timings.sort()
+        queries = stats['query_count'] / max(stats['requests'], 1)
+        _logger.info(
+            "%s [%s, %d products]: p50 %.1f ms, p95 %.1f ms, p99 %.1f ms, %.1f queries/request, %.1f ms SQL/request",
+            endpoint, label, self.catalog_size,
+            self._percentile(timings, 50) * 1000, self._percentile(timings, 95) * 1000,
+            self._percentile(timings, 99) * 1000, queries,
+            stats['sql_seconds'] * 1000 / max(stats['requests'], 1))
+
+        budget = budget or QUERY_BUDGETS[endpoint]
+        self.assertLessEqual(queries, budget, f"{endpoint} [{label}] exceeds its query budget")
+        return queries
+
+    def _percentile(self, timings, percentile):
+        index = min(len(timings) - 1, round(percentile / 100 * (len(timings) - 1)))
+        return timings[index]
+
+    def _order_lines(self, count, offset=0):
+        return [{
+            'product_code': f'BENCH-{(offset + index) % self.catalog_size:06d}',
+            'quantity': 1 + index % 3,
+        } for index in range(count)]
+
+    def test_benchmark_routes(self):
+        for scale in BENCH_SCALES:
+            with self.subTest(scale=scale):
+                self._seed_catalog(scale)
+                self._benchmark_products()
+                self._benchmark_orders()
+                self._benchmark_vehicles()
+
+    def _benchmark_products(self):
+        small = self._benchmark('ProductAPIController.get_products', 'page of 10', lambda i: self._request(
+            'POST', '/api/products', {'offset': i * 10 % self.catalog_size, 'limit': 10})[1])
+        large = self._benchmark('ProductAPIController.get_products', 'page of 200', lambda i: self._request(
+            'POST', '/api/products', {'offset': i * 200 % max(self.catalog_size - 200, 1), 'limit': 200})[1])
+        self.assertLessEqual(large - small, 2, "Query count of /api/products grows with the page size")
+
+        deep_cursor = encode_cursor(self.env['product.product'].search([], order='id desc', limit=1, offset=100).id)
+        self._benchmark('ProductAPIController.get_products', 'deep cursor page', lambda i: self._request(
+            'POST', '/api/products', {'cursor': deep_cursor, 'limit': 50})[1])
+
+        product_ids = self.env['product.product'].search(
+            [('default_code', '=like', 'BENCH-%')], limit=BENCH_ITERATIONS).ids
+        self._benchmark('ProductAPIController.get_product_by_id', 'detail', lambda i: self._request(
+            'GET', f'/api/product/{product_ids[i % len(product_ids)]}')[1])
+
+        image_ids = self.env['product.product'].search(
+            [('default_code', '=like', 'BENCH-%0')], limit=BENCH_ITERATIONS).ids
+        self._benchmark('ProductAPIController.get_product_image', 'size 128', lambda i: self._request(
+            'GET', f'/api/product/image/{image_ids[i % len(image_ids)]}', {'size': 128}, json_rpc=False)[1])
+
+    def _benchmark_orders(self):
+        orders = []
+
+        def create_order(lines, payment_status):
+            def call(iteration):
+                result, elapsed = self._request('POST', '/api/create_order', {
+                    'products': self._order_lines(lines, offset=iteration * lines),
+                    'payment_status': payment_status,
+                })
+                orders.append(result['sale_order'])
+                return elapsed
+            return call
+
+        small = self._benchmark('SaleOrderAPIController.create_order', 'unpaid, 5 lines', create_order(5, 'unpaid'))
+        large = self._benchmark('SaleOrderAPIController.create_order', 'unpaid, 50 lines', create_order(50, 'unpaid'))
+        self.assertLessEqual(large - small, 10, "Query count of /api/create_order grows with the line count")
+
+        self._benchmark('SaleOrderAPIController.create_order', 'paid, 10 lines', create_order(10, 'paid'),
+                        iterations=5, budget=PAID_ORDER_QUERY_BUDGET)
+
+        order_ids = self.env['sale.order'].search([('name', 'in', orders)]).ids
+        if len(order_ids) < TRACK_BATCH_SIZE:
+            builder = self.env['sale.order.api.builder']
+            lines = self._order_lines(5)
+            products_by_code = builder.resolve_products([line['product_code'] for line in lines])
+            order_ids += builder.create_orders(self.env.ref('base.user_admin'), [
+                ({'partner_id': self.customers[index % len(self.customers)].id}, lines)
+                for index in range(TRACK_BATCH_SIZE - len(order_ids))
+            ], products_by_code).ids
+        self._benchmark('SaleOrderAPIController.track_order', 'single', lambda i: self._request(
+            'POST', '/api/track_order', {'sale_order_id': order_ids[i % len(order_ids)]})[1])
+
+        small = self._benchmark('SaleOrderAPIController.track_orders', 'batch of 5', lambda i: self._request(
+            'POST', '/api/track_orders', {'sale_order_ids': order_ids[:5]})[1])
+        large = self._benchmark('SaleOrderAPIController.track_orders', f'batch of {TRACK_BATCH_SIZE}', lambda i: self._request(
+            'POST', '/api/track_orders', {'sale_order_ids': order_ids[:TRACK_BATCH_SIZE]})[1])
+        self.assertLessEqual(large - small, 2, "Query count of /api/track_orders grows with the batch size")
+
+    def _benchmark_vehicles(self):
+        def create_vehicle(iteration):
+            customer = self.customers[iteration % len(self.customers)]
+            return self._request('POST', '/api/vehicle/create', {
+                'name': 'Benchmark Car',
+                'registration_number': f'BENCH-{self.catalog_size}-{iteration}',
+                'owner_id': customer.id,
+                'model': 'Series 3',
+            })[1]
+
+        def delete_vehicle(iteration):
+            customer = self.customers[iteration % len(self.customers)]
+            return self._request('DELETE', '/api/vehicle/delete', {
+                'registration_number': f'BENCH-{self.catalog_size}-{iteration}',
+                'owner_id': customer.id,
+            })[1]
+
+        self._benchmark('VehicleController.create_vehicle', 'single', create_vehicle)
+        self._benchmark('VehicleController.list_vehicles', 'by owner', lambda i: self._request(
+            'POST', '/api/vehicles', {'owner_id': self.customers[i % len(self.customers)].id})[1])
+        self._benchmark('VehicleController.delete_vehicle', 'single', delete_vehicle)
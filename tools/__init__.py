@@ -0,0 +1,3 @@
+from . import metrics
+from . import rate_limit
+from . import response_cache
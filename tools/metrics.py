@@ -0,0 +1,97 @@
+from collections import defaultdict
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class RouteMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self._queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self._sql_seconds = defaultdict(float)
+        self._orm_seconds = defaultdict(float)
+        self._payload_bytes = defaultdict(int)
+        self._responses = defaultdict(int)
+
+    def record(self, endpoint, status, wall_time, query_count, query_time, payload_size):
+        with self._lock:
+            self._latency[endpoint].observe(wall_time)
+            self._queries[endpoint].observe(query_count)
+            self._sql_seconds[endpoint] += query_time
+            self._orm_seconds[endpoint] += max(wall_time - query_time, 0.0)
+            self._payload_bytes[endpoint] += payload_size
+            self._responses[endpoint, status] += 1
+
+    def snapshot(self, endpoint):
+        with self._lock:
+            latency = self._latency.get(endpoint)
+            queries = self._queries.get(endpoint)
+            return {
+                'requests': latency.count if latency else 0,
+                'latency_seconds': latency.sum if latency else 0.0,
+                'query_count': queries.sum if queries else 0,
+                'sql_seconds': self._sql_seconds.get(endpoint, 0.0),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            self._render_histogram(lines, 'product_api_request_duration_seconds',
+                                   'Wall time spent in the route handler.', self._latency)
+            self._render_histogram(lines, 'product_api_sql_queries',
+                                   'SQL queries run per request.', self._queries)
+            self._render_counter(lines, 'product_api_sql_seconds_total',
+                                 'Time spent executing SQL.', self._sql_seconds)
+            self._render_counter(lines, 'product_api_orm_seconds_total',
+                                 'Time spent outside SQL (ORM and Python).', self._orm_seconds)
+            self._render_counter(lines, 'product_api_response_bytes_total',
+                                 'Response payload size; JSON bodies only when product_rest_api.measure_json_payload_size is set.', self._payload_bytes)
+
+            lines.append('# HELP product_api_responses_total Responses by status code.')
+            lines.append('# TYPE product_api_responses_total counter')
+            for (endpoint, status), count in sorted(self._responses.items()):
+                lines.append(f'product_api_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, lines, name, description, histograms):
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for endpoint, histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+    def _render_counter(self, lines, name, description, values):
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} counter')
+        for endpoint, value in sorted(values.items()):
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,35 @@
+import threading
+import time
+
+
+# Classic token bucket: `capacity` requests at once, refilled continuously
+# at capacity / period. Buckets are per worker process.
+class TokenBucketLimiter:
+    def __init__(self, capacity, period, max_keys=100000):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return allowed
+
+    def prune(self):
+        with self._lock:
+            self._prune(time.monotonic())
+
+    def _prune(self, now):
+        full_after = self.capacity / self.rate
+        for key in [key for key, (tokens, last) in self._buckets.items() if now - last >= full_after]:
+            del self._buckets[key]
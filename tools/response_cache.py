@@ -0,0 +1,70 @@
+from collections import OrderedDict
+import threading
+import time
+
+PRODUCT_CACHE_MAX_ENTRIES = 2048
+PRODUCT_CACHE_TTL = 30
+
+
+# Keys start with the database name so a write only drops that database's
+# entries. Invalidation is local to the worker; other workers see changes
+# once their entries expire.
+class ResponseCache:
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dbname):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dbname]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+            }
+
+
+product_response_cache = ResponseCache(PRODUCT_CACHE_MAX_ENTRIES, PRODUCT_CACHE_TTL)
+
+
+def invalidate_product_cache(env):
+    # Drop entries once the transaction commits, so no other request can
+    # re-cache the old values between the write and the commit.
+    if env.cr.postcommit.data.get('product_api_cache_invalidated'):
+        return
+    env.cr.postcommit.data['product_api_cache_invalidated'] = True
+    dbname = env.cr.dbname
+    env.cr.postcommit.add(lambda: product_response_cache.invalidate(dbname))